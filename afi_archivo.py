@@ -1,7 +1,625 @@
 """Módulo para gestionar archivos AFI"""  # TODO Convertir correctamente las funciones a validar campos
 
-from validaciones import AfiError, Validaciones
+import hashlib
+import linecache
+import mmap
+import os
+import pickle
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from array import array
+from operator import itemgetter, sub
+from sys import intern
+from validaciones import (
+    CARACTERES_ALFABETICOS,
+    AfiError,
+    Validaciones,
+    etiquetas_diccionario,
+)
+from estructuras import ESTRUCTURAS, REPETIDAS, calcular_posiciones, crear_extractor
+from registros import REGISTROS, RegistroPes
+import stdnum
 import diccionarios
+import estructuras
+import registros
+import validaciones
+
+
+class SeccionLinea(str):
+    """
+    Argumento de una validación que se sustituye por el valor de otra sección de la
+    misma línea (ya validada, si se valida antes), en lugar de pasarse tal cual.
+    """
+
+    __slots__ = ()
+
+
+# Validaciones que se aplican, en orden, a las secciones de cada cabecera.
+# Cada validación es (nombre_seccion, validador, argumentos adicionales del validador)
+# y, opcionalmente, una excepción (SeccionLinea(otra_seccion), prefijo): la validación
+# no se aplica si el valor (ya validado) de esa otra sección empieza por el prefijo.
+VALIDACIONES = {
+    "ETI": (
+        ("sintaxis", Validaciones.validar_valores, (["AFI9"],)),
+        ("version_mensaje", Validaciones.validar_numeros, ()),
+        ("id_programa", Validaciones.validar_obligatorio, ()),
+        ("version_proceso", Validaciones.validar_obligatorio, ()),
+        ("clave_autorizacion", Validaciones.validar_numeros, ()),
+        ("fecha", Validaciones.validar_numeros, ()),
+        ("hora", Validaciones.validar_numeros, ()),
+        ("nombre_archivo", Validaciones.validar_obligatorio, ()),
+        ("extension_archivo", Validaciones.validar_valores, (["AFI"],)),
+        ("prioridad", Validaciones.validar_valores, (["N"],)),
+        ("id_registro_ano", Validaciones.validar_numeros, ()),
+        ("id_registro_mes", Validaciones.validar_numeros, ()),
+        ("id_registro_serie", Validaciones.validar_numeros, ()),
+        ("id_registro_envio", Validaciones.validar_numeros, ()),
+        ("id_registro_ordinal", Validaciones.validar_numeros, ()),
+    ),
+    "EMP": (
+        (
+            "seguridad_social_regimen",
+            Validaciones.validar_diccionario,
+            (diccionarios.REGIMEN_SECTOR,),
+        ),
+        (
+            "seguridad_social_provincia",
+            Validaciones.validar_diccionario,
+            (diccionarios.PROVINCIAS,),
+        ),
+        ("seguridad_social_numero", Validaciones.validar_obligatorio, ()),
+        (
+            "empresario_tipo_identificacion",
+            Validaciones.validar_diccionario,
+            (diccionarios.TIPO_IDENTIFICACION,),
+        ),
+        (
+            "empresario_codigo_pais",
+            Validaciones.validar_diccionario,
+            (diccionarios.PAISES,),
+        ),
+        (
+            "empresario_numero_identificacion",
+            Validaciones.validar_tipo_documento,
+            (SeccionLinea("empresario_tipo_identificacion"),),
+        ),
+        (
+            "ccc_regimen",
+            Validaciones.validar_diccionario,
+            (diccionarios.REGIMEN_SECTOR,),
+        ),
+        ("ccc_provincia", Validaciones.validar_diccionario, (diccionarios.PROVINCIAS,)),
+        ("accion", Validaciones.validar_diccionario, (diccionarios.ACCIONES_EMP, True)),
+    ),
+    "RZS": (
+        (
+            "indicador_rzs",
+            Validaciones.validar_valores,
+            (["0", "1", "2", "3", "4"],),
+        ),
+        (
+            "tipo_alfabetico",
+            Validaciones.validar_diccionario,
+            (diccionarios.TIPO_AFABETICO_EMPRESARIO,),
+        ),
+    ),
+    "PES": tuple(
+        (
+            f"peculiaridad_{i}",
+            Validaciones.validar_diccionario,
+            (diccionarios.TIPO_PECULIARIDAD_COTIZACION,),
+        )
+        for i in range(1, 34)
+    ),
+    "TRA": (
+        ("ss_provincia", Validaciones.validar_diccionario, (diccionarios.PROVINCIAS,)),
+        ("ss_numero", Validaciones.validar_numeros, ()),
+        ("ipf_tipo", Validaciones.validar_diccionario, (diccionarios.IPF,)),
+        ("ipf_pais", Validaciones.validar_diccionario, (diccionarios.PAISES,)),
+        (
+            "ipf_alfaclave",
+            Validaciones.validar_tipo_documento,
+            (SeccionLinea("ipf_tipo"),),
+        ),
+        (
+            "nacionalidad",
+            Validaciones.validar_diccionario,
+            (diccionarios.PAISES,),
+            (SeccionLinea("ipf_tipo"), "1"),  # Opcional para DNI
+        ),
+    ),
+    "AYN": (("primer_apellido", Validaciones.validar_letras, ()),),
+    "DOM": (
+        ("dom_tipo_via", Validaciones.validar_diccionario, (diccionarios.TIPO_VIA,)),
+    ),
+    "ODL": (
+        ("convenio_colectivo", Validaciones.validar_numeros, ()),
+        ("ocupacion_cno", Validaciones.validar_numeros, ()),
+        ("reservado_2", Validaciones.validar_numeros, ()),
+        ("importe_contribucion_entero", Validaciones.validar_numeros, ()),
+        ("importe_contribucion_decimal", Validaciones.validar_numeros, ()),
+        ("pais", Validaciones.validar_numeros, ()),
+        ("fin_previsto_contrato", Validaciones.validar_numeros, ()),
+    ),
+}
+
+
+def _posicionar_validaciones(cabecera, validaciones):
+    """
+    Añade a cada validación el índice y la posición de su sección en la línea.
+
+    Args:
+        cabecera (str): Cabecera de las validaciones.
+        validaciones (tuple): Validaciones de la cabecera (ver VALIDACIONES).
+
+    Returns:
+        tuple: (indice, nombre_seccion, columna, validador, argumentos, excepcion) de
+        cada validación, donde excepcion es None si no tiene.
+
+    Raises:
+        KeyError: Si una validación se refiere a una sección que no existe en la
+            estructura de la cabecera.
+    """
+    posiciones = calcular_posiciones(ESTRUCTURAS[cabecera])
+    indices = {nombre: indice for indice, nombre in enumerate(posiciones)}
+    posicionadas = []
+    for nombre_seccion, validador, argumentos, *excepcion in validaciones:
+        excepcion = excepcion[0] if excepcion else None
+        referencias = [a for a in argumentos if isinstance(a, SeccionLinea)]
+        if excepcion is not None:
+            referencias.append(excepcion[0])
+        for referencia in referencias:
+            if referencia not in indices:
+                raise KeyError(f"{cabecera}: no existe la sección '{referencia}'")
+        posicionadas.append(
+            (
+                indices[nombre_seccion],
+                nombre_seccion,
+                posiciones[nombre_seccion],
+                validador,
+                argumentos,
+                excepcion,
+            )
+        )
+    return tuple(posicionadas)
+
+
+# Validaciones con la posición de cada sección ya resuelta, se calculan una sola vez
+VALIDACIONES_POSICIONADAS = {
+    cabecera: _posicionar_validaciones(cabecera, validaciones)
+    for cabecera, validaciones in VALIDACIONES.items()
+}
+
+
+def _agrupar_numericas(cabecera, validaciones):
+    """
+    Agrupa las secciones numéricas de una cabecera para validarlas todas de una vez.
+
+    Args:
+        cabecera (str): Cabecera de las validaciones.
+        validaciones (tuple): Validaciones posicionadas de la cabecera.
+
+    Returns:
+        tuple | None: Un extractor de las secciones numéricas, la suma de sus anchos y
+        el resto de validaciones; None si la cabecera tiene menos de dos.
+    """
+    anchos = dict(ESTRUCTURAS[cabecera])
+    numericas = [v for v in validaciones if v[3] is Validaciones.validar_numeros]
+    if len(numericas) < 2:
+        return None
+    return (
+        itemgetter(*(indice for indice, *_ in numericas)),
+        sum(anchos[nombre_seccion] for _, nombre_seccion, *_ in numericas),
+        tuple(v for v in validaciones if v[3] is not Validaciones.validar_numeros),
+    )
+
+
+# Secciones numéricas agrupadas de cada cabecera (None si tiene menos de dos)
+NUMERICAS = {
+    cabecera: _agrupar_numericas(cabecera, validaciones)
+    for cabecera, validaciones in VALIDACIONES_POSICIONADAS.items()
+}
+
+
+# Separa una línea PES en todas sus secciones de una sola vez
+EXTRACTOR_PES = crear_extractor(ESTRUCTURAS["PES"])
+
+# Resultado de validar cada peculiaridad de cotización, tal y como lo devuelve
+# validar_diccionario, para resolver las 33 de una línea PES sin validarlas una a una
+PECULIARIDADES_ETIQUETADAS = etiquetas_diccionario(
+    diccionarios.TIPO_PECULIARIDAD_COTIZACION
+)
+
+
+# Docstring de los parsers generados
+DOCSTRING_PARSER = """
+        {descripcion}
+
+        Args:
+            fila (int): Número de línea actual.
+            linea (str): Contenido de la línea.
+
+        Returns:
+            {registro} con el contenido de la línea separado por secciones.
+        """
+
+
+# Regla que cumple una sección válida para los validadores que la devuelven sin cambios,
+# como expresión sobre {seccion} y, en su caso, {valores} (los valores permitidos). Los
+# parsers generados la comprueban en línea y solo llaman al validador (para que lance
+# su error) si no se cumple, así que cada regla debe aceptar exactamente lo mismo que
+# su validador en validaciones.py.
+REGLA_NUMEROS = "{seccion}.isascii() and {seccion}.isdigit()"
+REGLAS_VALIDADORES = {
+    Validaciones.validar_numeros: REGLA_NUMEROS,
+    Validaciones.validar_letras: (
+        "{seccion} and not {seccion}.isspace()"
+        " and CARACTERES_ALFABETICOS.issuperset({seccion})"
+    ),
+    Validaciones.validar_obligatorio: "{seccion} and not {seccion}.isspace()",
+    Validaciones.validar_valores: "{seccion} in {valores}",
+}
+
+
+def _codigo_validacion(validacion, constantes):
+    """
+    Genera el código que aplica una validación posicionada a su sección.
+
+    Args:
+        validacion (tuple): Validación posicionada (ver VALIDACIONES_POSICIONADAS).
+        constantes (dict): Espacio de nombres del parser generado, donde se añaden los
+            argumentos del validador.
+
+    Returns:
+        list[str]: Líneas de código, sin indentar.
+    """
+    _, nombre_seccion, columna, validador, argumentos, excepcion = validacion
+    if excepcion is not None:
+        seccion_excepcion, prefijo = excepcion
+        return [f"if not {seccion_excepcion}.startswith({prefijo!r}):"] + [
+            "    " + linea
+            for linea in _codigo_validacion(validacion[:-1] + (None,), constantes)
+        ]
+    nombres_argumentos = []
+    for numero, argumento in enumerate(argumentos):
+        if isinstance(argumento, SeccionLinea):
+            nombres_argumentos.append(f", {argumento}")
+            continue
+        nombre_argumento = f"_{nombre_seccion}_{numero}"
+        constantes[nombre_argumento] = argumento
+        nombres_argumentos.append(f", {nombre_argumento}")
+    # El validador se llama a través de self para que se usen los de las subclases
+    llamada = (
+        f"{nombre_seccion} = self.{validador.__name__}(archivo, {nombre_seccion}, "
+        f"{nombre_seccion!r}, fila, {columna}{''.join(nombres_argumentos)})"
+    )
+    if validador is Validaciones.validar_diccionario:
+        # Las etiquetas nunca son cadenas vacías, así que solo se llama al validador
+        # (para que lance su error o admita una sección en blanco) si no está la clave
+        etiquetas = f"_{nombre_seccion}_etiquetas"
+        constantes[etiquetas] = etiquetas_diccionario(argumentos[0])
+        return [
+            f"{nombre_seccion} = {etiquetas}.get({nombre_seccion}) or "
+            + llamada.partition(" = ")[2]
+        ]
+    # Los validadores que devuelven la sección sin cambios solo se llaman (para que
+    # lancen su error) si la sección no cumple su regla; el resto se llaman siempre
+    regla = REGLAS_VALIDADORES.get(validador)
+    if regla is None:
+        return [llamada]
+    valores = f"_{nombre_seccion}_valores"
+    if validador is Validaciones.validar_valores:
+        constantes[valores] = frozenset(*argumentos)
+    return [
+        f"if not ({regla.format(seccion=nombre_seccion, valores=valores)}):",
+        "    " + llamada,
+    ]
+
+
+def _generar_parser(cabecera, nombre_funcion, descripcion):
+    """
+    Genera una función de parseo específica para una cabecera a partir de su
+    estructura y sus validaciones. El código resultante recorta cada sección y la
+    valida en línea, sin recorrer tablas de secciones ni validaciones por cada línea.
+
+    Args:
+        cabecera (str): Cabecera de las líneas que parsea la función.
+        nombre_funcion (str): Nombre de la función generada.
+        descripcion (str): Primera línea del docstring de la función generada.
+
+    Returns:
+        callable: Función (self, fila, linea) que devuelve el registro de la línea.
+    """
+    estructura = ESTRUCTURAS[cabecera]
+    nombres = [nombre for nombre, _ in estructura]
+    posiciones = calcular_posiciones(estructura)
+    repetidas = REPETIDAS[cabecera]
+    registro = REGISTROS[cabecera]
+    constantes = {
+        "__name__": __name__,  # Módulo de las funciones generadas
+        "intern": intern,
+        "nuevo": tuple.__new__,
+        "CARACTERES_ALFABETICOS": CARACTERES_ALFABETICOS,
+        registro.__name__: registro,
+    }
+    codigo = [f"def {nombre_funcion}(self, fila, linea):"]
+    for indice, (nombre, ancho) in enumerate(estructura):
+        inicio = posiciones[nombre]
+        recorte = f"linea[{inicio}:{inicio + ancho}]"
+        if indice in repetidas:
+            recorte = f"intern({recorte})"
+        codigo.append(f"    {nombre} = {recorte}")
+
+    validaciones = VALIDACIONES_POSICIONADAS.get(cabecera, ())
+    if validaciones:
+        codigo.append("    archivo = self.nombre")
+    numericas = NUMERICAS.get(cabecera)
+    if numericas is None:
+        for validacion in validaciones:
+            codigo.extend(
+                "    " + linea for linea in _codigo_validacion(validacion, constantes)
+            )
+    else:
+        # Las secciones numéricas se comprueban juntas; solo si alguna falla se
+        # validan todas en orden para informar del error concreto
+        extractor_numericas, ancho_numericas, resto = numericas
+        secciones_numericas = extractor_numericas(nombres)
+        codigo.append(f"    digitos = {' + '.join(secciones_numericas)}")
+        codigo.append(
+            f"    if len(digitos) == {ancho_numericas} and "
+            + REGLA_NUMEROS.format(seccion="digitos")
+            + ":"
+        )
+        for validacion in resto:
+            codigo.extend(
+                "        " + linea
+                for linea in _codigo_validacion(validacion, constantes)
+            )
+        if not resto:
+            codigo.append("        pass")
+        codigo.append("    else:")
+        for validacion in validaciones:
+            codigo.extend(
+                "        " + linea
+                for linea in _codigo_validacion(validacion, constantes)
+            )
+    codigo.append(f"    return nuevo({registro.__name__}, ({', '.join(nombres)},))")
+
+    fuente = "\n".join(codigo) + "\n"
+    nombre_fuente = f"<parser {cabecera}>"
+    # Se registra la fuente para que las trazas de error muestren el código generado
+    linecache.cache[nombre_fuente] = (
+        len(fuente),
+        None,
+        fuente.splitlines(True),
+        nombre_fuente,
+    )
+    exec(compile(fuente, nombre_fuente, "exec"), constantes)
+    funcion = constantes[nombre_funcion]
+    funcion.__qualname__ = f"AfiArchivo.{nombre_funcion}"
+    funcion.__doc__ = DOCSTRING_PARSER.format(
+        descripcion=descripcion, registro=registro.__name__
+    )
+    return funcion
+
+
+# Directorio por defecto donde cargar_o_parsear guarda los archivos ya parseados
+DIRECTORIO_CACHE = os.path.join("~", ".cache", "afi")
+
+
+@lru_cache(maxsize=None)
+def _huella_codigo():
+    """
+    Calcula una huella del código que determina el resultado del parseo (este módulo,
+    validaciones, estructuras, registros, diccionarios y la versión de python-stdnum,
+    que valida los CIF), para que los resultados guardados en caché dejen de usarse en
+    cuanto cambie alguno de ellos. Se calcula una sola vez por proceso.
+
+    Returns:
+        str: Resumen SHA-256 en hexadecimal del contenido de los módulos.
+    """
+    huella = hashlib.sha256(f"stdnum {stdnum.__version__}\0".encode())
+    for modulo in (validaciones, estructuras, registros, diccionarios):
+        with open(modulo.__file__, "rb") as f:
+            huella.update(f.read())
+    with open(__file__, "rb") as f:
+        huella.update(f.read())
+    return huella.hexdigest()
+
+
+# Tamaño de los bloques en que se recorre un archivo mapeado para comprobar si es ASCII
+TAMANO_BLOQUE_ASCII = 1 << 20
+
+# Por debajo de este número de líneas parsear_paralelo parsea en el propio proceso
+MIN_LINEAS_PARALELO = 10_000
+# Mínimo de líneas que se envían a cada proceso, para amortizar el coste de enviarlas
+MIN_LINEAS_BLOQUE = 4_000
+# Máximo de líneas de cada bloque, para no tener decodificada a la vez una parte grande
+# de un archivo mapeado mientras espera a que la parsee otro proceso
+MAX_LINEAS_BLOQUE = 50_000
+
+
+def _leer_cache(ruta_cache):
+    """
+    Lee los resultados guardados por `AfiArchivo.cargar_o_parsear`.
+
+    Args:
+        ruta_cache (str): Ruta del archivo de caché.
+
+    Returns:
+        tuple[list, list[str]] | None: Registros y errores de parseo guardados, o None
+        si no hay caché o no se puede usar (ilegible, incompleta o con otro formato).
+    """
+    try:
+        with open(ruta_cache, "rb") as f:
+            resultados, errores_parseo = pickle.load(f)
+    except Exception:  # Cualquier fallo al leerla equivale a no tener caché
+        return None
+    if not isinstance(resultados, list) or not isinstance(errores_parseo, list):
+        return None
+    return resultados, errores_parseo
+
+
+def _guardar_cache(ruta_cache, datos):
+    """
+    Guarda los resultados de `AfiArchivo.cargar_o_parsear` si es posible. La caché es
+    opcional: si no se puede escribir (permisos, disco lleno...) no se guarda y no se
+    deja ningún archivo temporal.
+
+    Args:
+        ruta_cache (str): Ruta del archivo de caché.
+        datos (tuple[list, list[str]]): Registros y errores de parseo.
+    """
+    # Se escribe en un temporal y se renombra para no dejar nunca un archivo a medias
+    ruta_temporal = f"{ruta_cache}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(ruta_cache), exist_ok=True)
+        with open(ruta_temporal, "wb") as f:
+            pickle.dump(datos, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(ruta_temporal, ruta_cache)
+    except OSError:
+        try:
+            os.remove(ruta_temporal)
+        except OSError:
+            pass  # No se llegó a crear
+
+
+class LineasMapeadas:
+    """
+    Vista de solo lectura sobre las líneas de un archivo mapeado en memoria (mmap).
+
+    Evita leer el archivo entero a una lista de strings: solo se guardan las posiciones
+    de inicio y fin de cada línea y el texto se decodifica cuando se accede a ella.
+
+    Atributos:
+        ruta (str): Ruta del archivo mapeado.
+        encoding (str): Codificación usada para decodificar cada línea.
+    """
+
+    def __init__(self, ruta, encoding="utf-8"):
+        """
+        Mapea el archivo en memoria e indexa sus líneas.
+
+        Args:
+            ruta (str): Ruta del archivo a mapear.
+            encoding (str, optional): Codificación del archivo. Por defecto "utf-8".
+        """
+        self.ruta = ruta
+        self.encoding = encoding
+        fd = os.open(ruta, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            if os.fstat(fd).st_size == 0:
+                self._mm = None  # No se puede mapear un archivo vacío
+            else:
+                self._mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        if self._mm is not None and hasattr(mmap, "MADV_SEQUENTIAL"):
+            self._mm.madvise(mmap.MADV_SEQUENTIAL)  # Lectura anticipada del SO
+        self._cerrado = False
+        self._inicios = array("q")
+        self._finales = array("q")
+        self._indexar()
+
+    def _comprobar_abierto(self):
+        """
+        Comprueba que el archivo siga mapeado antes de acceder a sus líneas.
+
+        Raises:
+            ValueError: Si ya se ha liberado el mapeo con `cerrar`.
+        """
+        if self._cerrado:
+            raise ValueError(f"archivo cerrado: {self.ruta}")
+
+    def _indexar(self):
+        """Guarda dónde empieza y acaba cada línea, sin el salto de línea."""
+        mm = self._mm
+        if mm is None:
+            return
+        total = len(mm)
+        inicio = 0
+        while inicio < total:
+            salto = mm.find(b"\n", inicio)
+            siguiente = total if salto == -1 else salto + 1
+            fin = total if salto == -1 else salto
+            if fin > inicio and mm[fin - 1] == 0x0D:  # Saltos de línea de Windows
+                fin -= 1
+            self._inicios.append(inicio)
+            self._finales.append(fin)
+            inicio = siguiente
+
+    def __len__(self):
+        self._comprobar_abierto()
+        return len(self._inicios)
+
+    def longitudes(self):
+        """
+        Devuelve la longitud de cada línea. Si el archivo solo contiene caracteres
+        ASCII (un byte por carácter) se calcula con las posiciones ya indexadas, sin
+        decodificar las líneas; si no, se decodifica cada línea para medirla.
+
+        Returns:
+            Iterable[int]: Longitud en caracteres de cada línea, en orden.
+        """
+        if self.es_ascii():
+            return map(sub, self._finales, self._inicios)
+        return map(len, self)
+
+    def es_ascii(self):
+        """
+        Comprueba si el archivo solo contiene caracteres ASCII, por bloques para no
+        copiar el archivo entero en memoria.
+
+        Returns:
+            bool: True si todos los bytes del archivo son ASCII.
+        """
+        self._comprobar_abierto()
+        mm = self._mm
+        if mm is None:
+            return True
+        return all(
+            mm[inicio : inicio + TAMANO_BLOQUE_ASCII].isascii()
+            for inicio in range(0, len(mm), TAMANO_BLOQUE_ASCII)
+        )
+
+    def actualizar_huella(self, huella):
+        """
+        Añade el contenido del archivo a un resumen (hash), sin copiarlo en memoria.
+
+        Args:
+            huella: Objeto de hashlib (o con el mismo método `update`).
+        """
+        self._comprobar_abierto()
+        if self._mm is not None:
+            huella.update(self._mm)
+
+    def __getitem__(self, indice):
+        self._comprobar_abierto()
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        return self._mm[self._inicios[indice] : self._finales[indice]].decode(
+            self.encoding
+        )
+
+    def __iter__(self):
+        self._comprobar_abierto()
+        mm = self._mm
+        encoding = self.encoding
+        for inicio, fin in zip(self._inicios, self._finales):
+            yield mm[inicio:fin].decode(encoding)
+
+    def cerrar(self):
+        """
+        Libera el mapeo en memoria del archivo y el índice de sus líneas. Después no se
+        puede acceder a las líneas, como ocurre con un archivo cerrado.
+        """
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._inicios = array("q")
+        self._finales = array("q")
+        self._cerrado = True
 
 
 class AfiArchivo(Validaciones):
@@ -10,13 +628,20 @@ class AfiArchivo(Validaciones):
 
     Hereda de:
         Validaciones: Clase con métodos estáticos para validar contenido de archivos.
+            Los parsers llaman a los validadores a través de la instancia, así que una
+            subclase puede redefinirlos. Para no llamarlos en cada línea, las secciones
+            que cumplen la regla base de validar_numeros, validar_letras,
+            validar_obligatorio o validar_valores, o que son claves del diccionario de
+            validar_diccionario, se aceptan sin llamar al validador; validar_tipo_documento
+            se llama siempre.
 
     Atributos:
         nombre (str): Nombre del archivo.
-        lineas (list[str]): Lista de líneas del archivo.
-        resultados (list): Resultados parseados correctamente.
+        lineas (list[str] | LineasMapeadas): Lista de líneas del archivo.
+        resultados (list[tuple]): Registros (ver registros.py) parseados correctamente.
         errores_parseo (list[str]): Lista de errores ocurridos durante el parseo.
-        parsers (dict[str, callable]): Diccionario que mapea cabeceras a funciones de parseo.
+        PARSERS (dict[str, callable]): Diccionario de clase que mapea cabeceras a
+            funciones de parseo (reciben la instancia como primer argumento).
     """
 
     def __init__(self, nombre_archivo, lineas):
@@ -31,19 +656,73 @@ class AfiArchivo(Validaciones):
         self.lineas = lineas
         self.resultados = []
         self.errores_parseo = []
-        self.parsers = {
-            "ETI": self.parse_linea_eti,
-            "EMP": self.parse_linea_emp,
-            "RZS": self.parse_linea_rzs,
-            "PES": self.parse_linea_pes,
-            "TRA": self.parse_linea_tra,
-            "AYN": self.parse_linea_ayn,
-            "DOM": self.parse_linea_dom,
-            "LDD": self.parse_linea_ldd,
-            "FAB": self.parse_linea_fab,
-            "DAM": self.parse_linea_dam,
-            "ODL": self.parse_linea_odl,
-        }
+
+    @classmethod
+    def desde_ruta(cls, ruta, encoding="utf-8"):
+        """
+        Crea una instancia de AfiArchivo mapeando el archivo en memoria, sin cargar
+        todas sus líneas en una lista. Se recomienda usarlo con `with` para liberar
+        el mapeo al terminar.
+
+        Args:
+            ruta (str): Ruta del archivo .afi.
+            encoding (str, optional): Codificación del archivo. Por defecto "utf-8".
+
+        Returns:
+            AfiArchivo: Instancia cuyas líneas se leen directamente del archivo.
+        """
+        return cls(os.path.basename(ruta), LineasMapeadas(ruta, encoding))
+
+    @classmethod
+    def cargar_o_parsear(
+        cls, ruta, directorio_cache=DIRECTORIO_CACHE, encoding="utf-8"
+    ):
+        """
+        Crea una instancia de AfiArchivo como `desde_ruta` y la parsea, reutilizando el
+        resultado guardado en `directorio_cache` si ya se parseó un archivo con el mismo
+        nombre y contenido con la misma versión del código. Si no, lo parsea y guarda
+        el resultado para la próxima vez. La caché es opcional: si no se puede leer o
+        escribir, el archivo se parsea igualmente.
+
+        Args:
+            ruta (str): Ruta del archivo .afi.
+            directorio_cache (str, optional): Directorio donde se guardan los
+                resultados. Por defecto "~/.cache/afi".
+            encoding (str, optional): Codificación del archivo. Por defecto "utf-8".
+
+        Returns:
+            AfiArchivo: Instancia con `resultados` y `errores_parseo` ya rellenos.
+        """
+        afi = cls.desde_ruta(ruta, encoding)
+        try:
+            clave = hashlib.sha256(
+                f"{_huella_codigo()}\0{afi.nombre}\0{encoding}\0".encode()
+            )
+            afi.lineas.actualizar_huella(clave)
+            ruta_cache = os.path.join(
+                os.path.expanduser(directorio_cache), clave.hexdigest() + ".pkl"
+            )
+            guardado = _leer_cache(ruta_cache)
+            if guardado is not None:
+                afi.resultados, afi.errores_parseo = guardado
+                return afi
+            afi.parsear()
+        except BaseException:
+            afi.cerrar()
+            raise
+        _guardar_cache(ruta_cache, (afi.resultados, afi.errores_parseo))
+        return afi
+
+    def cerrar(self):
+        """Libera el archivo mapeado en memoria si las líneas provienen de uno."""
+        if isinstance(self.lineas, LineasMapeadas):
+            self.lineas.cerrar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.cerrar()
 
     def validar_longitud(self, longitud=70):
         """
@@ -55,19 +734,85 @@ class AfiArchivo(Validaciones):
         Raises:
             LongitudLineaError: Si alguna línea no tiene la longitud esperada.
         """
-        self.validar_longitudes(self.nombre, self.lineas, longitud)
+        longitudes = None
+        if isinstance(self.lineas, LineasMapeadas):
+            longitudes = self.lineas.longitudes()  # Sin decodificar las líneas
+        self.validar_longitudes(self.nombre, self.lineas, longitud, longitudes)
 
     def parsear(self):
         """
         Intenta parsear todas las líneas del archivo utilizando la función correspondiente.
         Guarda los resultados exitosos en `self.resultados` y los errores en `self.errores_parseo`.
+        Para archivos grandes que se recorren una sola vez es preferible `iterar_parseo`.
+        """
+        self.resultados.extend(registro for _, registro in self.iterar_parseo())
+
+    def parsear_paralelo(self, procesos=None):
+        """
+        Parsea el archivo repartiendo bloques de líneas consecutivas entre varios
+        procesos. Los resultados y errores se guardan en el mismo orden que con
+        `parsear`. Para archivos pequeños se parsea directamente, ya que el coste de
+        enviar las líneas a otros procesos no compensa. Cada bloque se extrae al
+        enviarlo, con como mucho dos bloques por proceso sin recoger.
+
+        Args:
+            procesos (int, optional): Número de procesos. Por defecto, uno por CPU.
+        """
+        procesos = procesos or os.cpu_count() or 1
+        total = len(self.lineas)
+        if procesos == 1 or total < MIN_LINEAS_PARALELO:
+            self.parsear()
+            return
+        tamano = min(MAX_LINEAS_BLOQUE, max(MIN_LINEAS_BLOQUE, -(-total // procesos)))
+
+        def recoger(futuro):
+            resultados, errores = futuro.result()
+            self.resultados.extend(resultados)
+            self.errores_parseo.extend(errores)
+
+        pendientes = deque()
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            for inicio in range(0, total, tamano):
+                if len(pendientes) >= 2 * procesos:
+                    recoger(pendientes.popleft())
+                pendientes.append(
+                    ejecutor.submit(
+                        _parsear_bloque,
+                        type(self),
+                        self.nombre,
+                        inicio + 1,
+                        self.lineas[inicio : inicio + tamano],
+                    )
+                )
+            while pendientes:
+                recoger(pendientes.popleft())
+
+    def iterar_parseo(self, fila_inicio=1):
+        """
+        Parsea las líneas del archivo de una en una, sin acumular los resultados en
+        memoria. Los errores se guardan igualmente en `self.errores_parseo`.
+
+        Args:
+            fila_inicio (int, optional): Número de fila de la primera línea. Por defecto 1.
+
+        Yields:
+            tuple[int, tuple]: Número de fila y registro de cada línea parseada.
         """
-        for fila, linea in enumerate(self.lineas, start=1):
+        # Referencias locales para no resolver atributos en cada línea del bucle
+        parsers = self.PARSERS
+        agregar_error = self.errores_parseo.append
+        for fila, linea in enumerate(self.lineas, start=fila_inicio):
+            parser_func = parsers.get(linea[0:3])
+            if parser_func is None:
+                # Se anota directamente, sin lanzar y capturar una excepción por línea
+                agregar_error(f"Fila {fila}: {self._error_cabecera(fila, linea)}")
+                continue
             try:
-                self.resultados.append(self.parse_linea(fila, linea))
+                registro = parser_func(self, fila, linea)
             except (AfiError, ValueError) as e:
-                self.errores_parseo.append(f"Fila {fila}: {e}")
-                continue
+                agregar_error(f"Fila {fila}: {e}")
+            else:
+                yield fila, registro
 
     def parse_linea(self, fila, linea):
         """
@@ -83,243 +828,41 @@ class AfiArchivo(Validaciones):
         Raises:
             ValueError: Si la cabecera de la línea no está reconocida.
         """
-        cabecera = linea[0:3]
-        parser_func = self.parsers.get(cabecera)
+        parser_func = self.PARSERS.get(linea[0:3])
         if parser_func is None:
-            raise ValueError(
-                f"{self.nombre}, fila {fila}: cabecera desconocida '{cabecera}'"
-            )
-        return parser_func(fila, linea)
+            raise ValueError(self._error_cabecera(fila, linea))
+        return parser_func(self, fila, linea)
 
-    def parse_linea_eti(self, fila, linea):
+    def _error_cabecera(self, fila, linea):
         """
-        Parsea la linea de ETIquetas de inicio
+        Construye el mensaje de error de una línea con cabecera desconocida.
 
         Args:
             fila (int): Número de línea actual.
             linea (str): Contenido de la línea.
 
         Returns:
-            Diccionario con el contenido de la línea separado por secciones.
+            str: Mensaje de error.
         """
-        cabecera = linea[0:3]  # Siempre ETI
-        sintaxis = self.validar_valores(
-            self.nombre, linea[3:7], "sintaxis", fila, 3, ["AFI9"]
-        )
-        version_mensaje = self.validar_numeros(
-            self.nombre, linea[7:8], "version_mensaje", fila, 7
-        )
-        id_programa = self.validar_obligatorio(
-            self.nombre, linea[8:12], "id_programa", fila, 8
-        )
-        version_proceso = self.validar_obligatorio(
-            self.nombre, linea[12:13], "version_proceso", fila, 12
-        )
-        clave_autorizacion = self.validar_numeros(
-            self.nombre, linea[13:21], "version_mensaje", fila, 13
-        )
-        reservado_1 = linea[21:29]
-        fecha = self.validar_numeros(
-            self.nombre, linea[29:37], "version_mensaje", fila, 29
-        )
-        hora = self.validar_numeros(
-            self.nombre, linea[37:41], "version_mensaje", fila, 37
-        )
-        nombre_archivo = self.validar_obligatorio(
-            self.nombre, linea[41:49], "nombre_archivo", fila, 41
-        )
-        extension_archivo = self.validar_valores(
-            self.nombre, linea[49:52], "extension_archivo", fila, 49, ["AFI"]
-        )
-        prioridad = self.validar_valores(
-            self.nombre, linea[52:53], "prioridad", fila, 49, ["N"]
-        )
-        indicador_prueba = linea[53:54]
-        # Debe estar vacío, P es prueba, N es no sustitutivo;
-        # "Solo afecta a las liquidaciones complementarias del tipo
-        # L02, L03, L09 (del mes en curso no), L13, TP2 y A76.
-        # Cuando venga consignada esta marca, no se procederá
-        # a la sustitución automática de estas liquidaciones por otras
-        # presentadas en el mismo período y con idéntico CCC, período
-        # de liquidación y tipo de liquidación."
-        id_registro_ano = self.validar_numeros(
-            self.nombre, linea[54:56], "id_registro_ano", fila, 54
-        )
-        id_registro_mes = self.validar_numeros(
-            self.nombre, linea[56:58], "id_registro_mes", fila, 56
-        )
-        id_registro_serie = self.validar_numeros(
-            self.nombre, linea[58:59], "id_registro_serie", fila, 58
-        )
-        id_registro_envio = self.validar_numeros(
-            self.nombre, linea[59:64], "id_registro_envio", fila, 59
-        )
-        id_registro_ordinal = self.validar_numeros(
-            self.nombre, linea[64:68], "id_registro_ordinal", fila, 64
-        )  # Refiere a dentro del lote (num envio), el orden del archivo (i.e. envio 3 archivo 2)
-        reservado_2 = linea[68:69]
-        reservado_3 = linea[69:70]
-
-        return {
-            "cabecera": cabecera,
-            "sintaxis": sintaxis,
-            "version_mensaje": version_mensaje,
-            "id_programa": id_programa,
-            "version_proceso": version_proceso,
-            "clave_autorizacion": clave_autorizacion,
-            "reservado_1": reservado_1,
-            "fecha": fecha,
-            "hora": hora,
-            "nombre_archivo": nombre_archivo,
-            "extension_archivo": extension_archivo,
-            "prioridad": prioridad,
-            "indicador_prueba": indicador_prueba,
-            "id_registro_ano": id_registro_ano,
-            "id_registro_mes": id_registro_mes,
-            "id_registro_serie": id_registro_serie,
-            "id_registro_envio": id_registro_envio,
-            "id_registro_ordinal": id_registro_ordinal,
-            "reservado_2": reservado_2,
-            "reservado_3": reservado_3,
-        }
-
-    def parse_linea_emp(self, fila, linea):
-        """
-        Parsea la linea de EMPresa
+        return f"{self.nombre}, fila {fila}: cabecera desconocida '{linea[0:3]}'"
 
-        Args:
-            fila (int): Número de línea actual.
-            linea (str): Contenido de la línea.
+    parse_linea_eti = _generar_parser(
+        "ETI", "parse_linea_eti", "Parsea la linea de ETIquetas de inicio"
+    )
 
-        Returns:
-            Diccionario con el contenido de la línea separado por secciones.
-        """
-        cabecera = linea[0:3]  # Siempre EMP
-        seguridad_social_regimen = self.validar_diccionario(
-            self.nombre,
-            linea[3:7],
-            "seguridad_social_regimen",
-            fila,
-            3,
-            diccionarios.REGIMEN_SECTOR,
-        )
-        seguridad_social_provincia = self.validar_diccionario(
-            self.nombre,
-            linea[7:9],
-            "seguridad_social_provincia",
-            fila,
-            7,
-            diccionarios.PROVINCIAS,
-        )
-        seguridad_social_numero = self.validar_obligatorio(
-            self.nombre, linea[9:18], "id_programa", fila, 8
-        )
-        empresario_tipo_identificacion = self.validar_diccionario(
-            self.nombre,
-            linea[18:19],
-            "empresario_tipo_identificacion",
-            fila,
-            18,
-            diccionarios.TIPO_IDENTIFICACION,
-        )
-        empresario_codigo_pais = self.validar_diccionario(
-            self.nombre,
-            linea[19:22],
-            "empresario_codigo_pais",
-            fila,
-            19,
-            diccionarios.PAISES,
-        )
-        empresario_numero_identificacion = self.validar_tipo_documento(
-            self.nombre,
-            linea[22:36],
-            "empresario_numero_identificacion",
-            fila,
-            22,
-            empresario_tipo_identificacion,
-        )  # Padding a la izquierda de ceros
-        empresario_calificador = linea[36:38]  # Opcional, subcif
-        ccc_regimen = self.validar_diccionario(
-            self.nombre,
-            linea[38:42],
-            "ccc_regimen",
-            fila,
-            38,
-            diccionarios.REGIMEN_SECTOR,
-        )
-        ccc_provincia = self.validar_diccionario(
-            self.nombre,
-            linea[42:44],
-            "ccc_provincia",
-            fila,
-            42,
-            diccionarios.PROVINCIAS,
-        )
-        ccc_numero = linea[44:53]  # Codigo Cuenta Cotización (CCC)
-        reservado_recaudacion = linea[53:66]
-        accion = self.validar_diccionario(
-            self.nombre,
-            linea[66:69],
-            "accion",
-            fila,
-            66,
-            diccionarios.ACCIONES_EMP,
-            True,
-        )
-        reservado = linea[69:70]
-
-        return {
-            "cabecera": cabecera,
-            "seguridad_social_regimen": seguridad_social_regimen,
-            "seguridad_social_provincia": seguridad_social_provincia,
-            "seguridad_social_numero": seguridad_social_numero,
-            "empresario_tipo_identificacion": empresario_tipo_identificacion,
-            "empresario_codigo_pais": empresario_codigo_pais,
-            "empresario_numero_identificacion": empresario_numero_identificacion,
-            "empresario_calificador": empresario_calificador,
-            "ccc_regimen": ccc_regimen,
-            "ccc_provincia": ccc_provincia,
-            "ccc_numero": ccc_numero,
-            "reservado_recaudacion": reservado_recaudacion,
-            "accion": accion,
-            "reservado": reservado,
-        }
-
-    def parse_linea_rzs(self, fila, linea):
-        """
-        Parsea la línea de RaZón Social
+    parse_linea_emp = _generar_parser(
+        "EMP", "parse_linea_emp", "Parsea la linea de EMPresa"
+    )
 
-        Args:
-            fila (int): Número de línea actual.
-            linea (str): Contenido de la línea.
+    parse_linea_rzs = _generar_parser(
+        "RZS", "parse_linea_rzs", "Parsea la línea de RaZón Social"
+    )
 
-        Returns:
-            Diccionario con el contenido de la línea separado por secciones.
-        """
-        cabecera = linea[0:3]  # Siempre RZS
-        indicador_rzs = self.validar_valores(
-            self.nombre, linea[3:4], "indicador_rzs", fila, 3, ["0", "1", "2", "3", "4"]
-        )  # Reservado
-        tipo_alfabetico = self.validar_diccionario(
-            self.nombre,
-            linea[4:5],
-            "tipo_alfabetico",
-            fila,
-            4,
-            diccionarios.TIPO_AFABETICO_EMPRESARIO,
-        )
-        razon_social = linea[5:60]
-        clave_autorizacion = linea[60:68]  # Para acción CTA, número de autorización
-        reservado = linea[68:70]
-
-        return {
-            "cabecera": cabecera,
-            "indicador_rzs": indicador_rzs,
-            "tipo_alfabetico": tipo_alfabetico,
-            "razon_social": razon_social,
-            "clave_autorizacion": clave_autorizacion,
-            "reservado": reservado,
-        }
+    parse_linea_pes_secciones = _generar_parser(
+        "PES",
+        "parse_linea_pes_secciones",
+        "Parsea la línea de PEculiaridades validando cada sección por separado",
+    )
 
     def parse_linea_pes(self, fila, linea):
         """
@@ -330,394 +873,78 @@ class AfiArchivo(Validaciones):
             linea (str): Contenido de la línea.
 
         Returns:
-            Diccionario con el contenido de la línea separado por secciones.
-        """
-        cabecera = linea[0:3]  # Siempre PES
-        resultado = {"cabecera": cabecera}
-
-        # Generar peculiaridad_1 a peculiaridad_33
-        for i in range(33):
-            start = 3 + (i * 2)
-            end = start + 2
-            key = f"peculiaridad_{i+1}"
-            resultado[key] = self.validar_diccionario(
-                self.nombre,
-                linea[start:end],
-                key,
-                fila,
-                start,
-                diccionarios.TIPO_PECULIARIDAD_COTIZACION,
-            )
-
-        return resultado
-
-    def parse_linea_tra(self, fila, linea):
-        """
-        Parsea la línea de TRAbajador
-
-        Args:
-            fila (int): Número de línea actual.
-            linea (str): Contenido de la línea.
-
-        Returns:
-            Diccionario con el contenido de la línea separado por secciones.
-        """
-        cabecera = linea[0:3]  # Siempre TRA
-        ss_provincia = self.validar_diccionario(
-            self.nombre,
-            linea[3:5],
-            "ss_provincia",
-            fila,
-            3,
-            diccionarios.PROVINCIAS,
-        )
-        ss_numero = self.validar_numeros(self.nombre, linea[5:15], "ss_numero", fila, 5)
-        ipf_tipo = self.validar_diccionario(
-            self.nombre,
-            linea[15:16],
-            "ipf_tipo",
-            fila,
-            15,
-            diccionarios.IPF,
-        )
-        ipf_pais = self.validar_diccionario(
-            self.nombre,
-            linea[16:19],
-            "ipf_pais",
-            fila,
-            16,
-            diccionarios.PAISES,
-        )
-        ipf_alfaclave = self.validar_tipo_documento(
-            self.nombre,
-            linea[19:33],
-            "ipf_alfaclave",
-            fila,
-            19,
-            ipf_tipo,
-        )  # Padding a la izquierda de ceros
-        reservado_respuesta_afi = linea[33:36]
-        reservado_recaudacion = linea[36:61]
-        if ipf_tipo[0] == "1":
-            nacionalidad = linea[61:64]  # Opcional para DNI
-        else:
-            nacionalidad = self.validar_diccionario(
-                self.nombre,
-                linea[61:64],
-                "nacionalidad",
-                fila,
-                61,
-                diccionarios.PAISES,
-            )
-        indicador_trabajador = linea[64:65]  # Reservado para futuro uso versión 9.6
-        reservado = linea[65:70]
-
-        return {
-            "cabecera": cabecera,
-            "ss_provincia": ss_provincia,
-            "ss_numero": ss_numero,
-            "ipf_tipo": ipf_tipo,
-            "ipf_pais": ipf_pais,
-            "ipf_alfaclave": ipf_alfaclave,
-            "reservado_respuesta_afi": reservado_respuesta_afi,
-            "reservado_recaudacion": reservado_recaudacion,
-            "nacionalidad": nacionalidad,
-            "indicador_trabajador": indicador_trabajador,
-            "reservado": reservado,
-        }
-
-    def parse_linea_ayn(self, fila, linea):
-        """Parsea la línea Apellidos Y Nombre
-
-        Args:
-            fila (int): Número de línea actual.
-            linea (str): Contenido de la línea.
-
-        Returns:
-            Diccionario con el contenido de la línea separado por secciones.
-        """
-        cabecera = linea[0:3]  # Siempre AYN
-        primer_apellido = self.validar_letras(
-            self.nombre, linea[3:23], "primer_apellido", fila, 3
-        )
-        segundo_apellido = linea[23:43]
-        nombre = linea[43:58]
-        reservado = linea[58:70]
-        return {
-            "cabecera": cabecera,
-            "primer_apellido": primer_apellido,
-            "segundo_apellido": segundo_apellido,
-            "nombre": nombre,
-            "reservado": reservado,
-        }
-
-    def parse_linea_dom(self, fila, linea):
-        """
-        Parsea la línea de DOMicilio, todos los paramentros menos la cabecera son opcionales
-
-        Args:
-            fila (int): Número de línea actual.
-            linea (str): Contenido de la línea.
-
-        Returns:
-            Diccionario con el contenido de la línea separado por secciones.
+            RegistroPes con el contenido de la línea separado por secciones.
         """
-        cabecera = linea[0:3]  # Siempre DOM
-        indicador_domicilio = linea[3:4]  # Reservado para uso futuro
-        dom_tipo_via = self.validar_diccionario(
-            self.nombre, linea[4:6], "dom_tipo_via", fila, 4, diccionarios.TIPO_VIA
-        )
-        dom_nombre_via = linea[6:42]
-        dom_numero = linea[42:47]  # Solo números
-        dom_bis = linea[47:49]
-        dom_bloque = linea[49:51]
-        dom_escalera = linea[51:53]
-        dom_piso = linea[53:55]
-        dom_puerta = linea[55:58]
-        telefono = linea[58:68]  # 10 dígitos, padding de ceros a la izquierda
-        reservado = linea[68:70]
-
-        return {
-            "cabecera": cabecera,
-            "indicador_domicilio": indicador_domicilio,
-            "dom_tipo_via": dom_tipo_via,
-            "dom_nombre_via": dom_nombre_via,
-            "dom_numero": dom_numero,
-            "dom_bis": dom_bis,
-            "dom_bloque": dom_bloque,
-            "dom_escalera": dom_escalera,
-            "dom_piso": dom_piso,
-            "dom_puerta": dom_puerta,
-            "telefono": telefono,
-            "reservado": reservado,
-        }
-
-    def parse_linea_ldd(self, fila, linea):
-        """
-        Parsea la linea de Localidad Domicilio Decodificado
-
-        Args:
-            fila (int): Número de línea actual.
-            linea (str): Contenido de la línea.
-
-        Returns:
-            Diccionario con el contenido de la línea separado por secciones.
-        """
-        cabecera = linea[0:3]  # Siempre LDD
-        codigo_postal = linea[3:8]
-        localidad = linea[8:48]
-        provincia = linea[
-            48:50
-        ]  # Lista de provincias https://www.seg-social.es/wps/wcm/connect/wss/99d52a02-2968-4f38-b594-290ce13c29fb/T62-Provincia.pdf?MOD=AJPERES
-        telefono_sms = linea[50:62]  # Solo para acciones MA o MB, left padding ceros
-        prefijo_pais = linea[62:65]  # Solo para acciones MA o MB
-        reservado = linea[
-            65:70
-        ]  # https://es.wikipedia.org/wiki/Anexo:Prefijos_telefónicos_mundiales
-
-        return {
-            "cabecera": cabecera,
-            "codigo_postal": codigo_postal,
-            "localidad": localidad,
-            "provincia": provincia,
-            "telefono_sms": telefono_sms,
-            "prefijo_pais": prefijo_pais,
-            "reservado": reservado,
-        }
-
-    def parse_linea_fab(self, fila, linea):
-        """
-        Parsea la linea de Fecha Alta Baja
-
-        Args:
-            fila (int): Número de línea actual.
-            linea (str): Contenido de la línea.
-
-        Returns:
-            Diccionario con el contenido de la línea separado por secciones.
-        """
-        return {
-            "cabecera": linea[0:3],  # Siempre FAB
-            "accion": linea[
-                3:6
-            ],  # Lista de acciones https://www.seg-social.es/wps/wcm/connect/wss/dad0574d-411d-4d69-b78f-9d7947ceabab/T07-Acci%C3%B3n+2024-02.pdf?MOD=AJPERES
-            "situacion": linea[
-                6:8
-            ],  # Lista de situaciones https://www.seg-social.es/wps/wcm/connect/wss/ac6c2087-f6d7-4f62-8f85-64c574a6698c/T21-Situaci%C3%B3n+2023-11.pdf?MOD=AJPERES
-            "fecha_real": linea[8:16],
-            "grupo_cotizacion": linea[
-                16:18
-            ],  # Lista de grupos de cotizacion https://www.seg-social.es/wps/wcm/connect/wss/d9ea5c7f-8bf6-41a7-91b6-daabaf67d371/T18-Grupo+de+cotizaci%C3%B3n.pdf?MOD=AJPERES
-            "grupo_cotizacion_diario": linea[18:19],  # Booleano S/N
-            "grado_discapacidad": linea[19:21],
-            "tipo_contrato": linea[
-                21:24
-            ],  # Lista de contratos https://www.seg-social.es/wps/wcm/connect/wss/53104a0c-a484-4728-948f-7355385cf99d/T19-Clave+de+Contrato+de+trabajo+2023-01.pdf?MOD=AJPERES
-            "condicion_desempleado": linea[
-                24:25
-            ],  # Lista de condiciones de desempleo https://www.seg-social.es/wps/wcm/connect/wss/ea63cb12-6a21-4d27-9e14-87fa971c938d/T37-Condici%C3%B3n+de+desempleado+2023-08.pdf?MOD=AJPERES
-            "mujer_subrepresentada": linea[25:26],  # Booleano S/N
-            "coeficiente_tiempo_parcial": linea[26:29],
-            "colectivo_trabajador": linea[
-                29:32
-            ],  # Listado de colectivos de trabajadores https://www.seg-social.es/wps/wcm/connect/wss/81619dd8-3725-4f83-92aa-325b8202fadc/T61-Colectivo+de+trabajador+2022-06.pdf?MOD=AJPERES
-            "indicador_impresion": linea[
-                32:33
-            ],  # Espacio = No Impresión; S = Impresión resolución; C = Impresión resolución + IDC; I=IDC.
-            "categoria_profesional": linea[
-                33:40
-            ],  # Obligatorio para Régimen 0911. Opcional para Régimen Especial de Trabajadores del Mar. No admisible para resto de regímenes.
-            "fecha_nacimiento": linea[40:48],
-            "sexo": linea[48:49],  # 1 hombre 2 mujer
-            "reservado": linea[49:50],
-            "cese_actividad": linea[
-                50:51
-            ],  # 5 = Extranjero obligación retorno país origen; 6 = Cese de actividad.
-            "coeficiente_huelga_ere": linea[51:54],
-            "mujer_reincorporada": linea[
-                54:55
-            ],  # S= Mujer reincorporada después de maternidad; 2=Superposición por 2ªreincorporación; 3=5 años de inactividad; 4=Mujer reincorporada después de excedencia.
-            "incapacitado_readmitido": linea[
-                55:56
-            ],  # Lista codigos https://www.seg-social.es/wps/wcm/connect/wss/59269e17-bb97-4c60-8ced-3bb5fa6a1ba6/T101+-+Incapacitado+readmitido+2023-08.pdf?MOD=AJPERES
-            "trabajador_autonomo": linea[
-                56:57
-            ],  # S= Sí; 1= Familiar 2º grado. Bonificación Ley 6/2017.
-            "5jr_semana": linea[
-                57:58
-            ],  # Booleano S/N. El campo “5JR/semana según convenio” deberá cumplimentarse en aquellos casos en los que el convenio colectivo que resulte de aplicación al trabajador, le permita realizar para un mismo empresario, un mínimo de 5 jornadas reales semanales.
-            "n_trabajadores_empresa": linea[
-                58:59
-            ],  # 1= Empresa <50 Trabajadores (Contrato emprendedores); 3=Menos de 10 trabajadores.
-            "relacion_laboral_especial": linea[
-                59:63
-            ],  # Lista relaciones laborales especiales https://www.seg-social.es/wps/wcm/connect/wss/378ec2c8-09d4-43d2-a027-5a31d29b5b2c/T38-Relaci%C3%B3n+Laboral+de+Car%C3%A1cter+Especial+2025-05.pdf?MOD=AJPERES
-            "tipo_inactividad": linea[
-                63:65
-            ],  # Lista tipos de inactividad https://www.seg-social.es/wps/wcm/connect/wss/08f5f0c8-8745-4872-82ff-d123ddef5cc3/T41-Tipos+de+inactividad+2025-05.pdf?MOD=AJPERES
-            "responsable_formacion": linea[65:66],  # Booleano S/N
-            "exenciones_trabajador": linea[66:67],  # Booleano S/N
-            "exclusion_social_victimas": linea[
-                67:68
-            ],  # Lista codigos https://www.seg-social.es/wps/wcm/connect/wss/f17bc7b7-7d13-40e8-9d89-b17d8f1776b9/T83-Exclusi%C3%B3n+social-V%C3%ADctimas+2024-11.pdf?MOD=AJPERES
-            "renta_activa_insercion": linea[68:69],  # Booleano S/N
-            "trabajadoras_24m_alumbramiento": linea[69:70],  # Booleano S/N
-        }
-
-    def parse_linea_dam(self, fila, linea):
-        """
-        Parsea la linea de Datos Asociados al Movimiento
-
-        Args:
-            fila (int): Número de línea actual.
-            linea (str): Contenido de la línea.
-
-        Returns:
-            Diccionario con el contenido de la línea separado por secciones.
-        """
-        return {
-            "cabecera": linea[0:3],  # Siempre DAM
-            "fecha_inicio_contrato": linea[3:11],
-            "fic_especifico": linea[
-                11:12
-            ],  # Obigatorio si fecha_inicio_contrato contiene algo, booleano S/N
-            "nuss_trabajador_sustituido": linea[12:24],
-            "causa_sustitucion": linea[
-                24:26
-            ],  # Obigatorio si nuss_trabajador_sustituido contiene algo (solo para sistema especial 32), lista causas https://www.seg-social.es/wps/wcm/connect/wss/333d95d6-b3a4-4b6c-89ac-cd888ac68c79/T39-Causa+de+sustituci%C3%B3n+2025-05.pdf?MOD=AJPERES
-            "permanencia_parte_entera": linea[26:27],  # De existir debe ser 1
-            "permamencia_parte_decimal": linea[27:29],  # De existir debe ser 33 o 61
-            "coeficiente_reductor_jubilacion": linea[
-                29:31
-            ],  # Solo para altas en regimenes 0111, 0811 y 0911
-            "relevo": linea[31:32],
-            "dias_trabajados": linea[32:34],
-            "sistema_especial": linea[
-                34:36
-            ],  # Desuso, tabla https://www.seg-social.es/wps/wcm/connect/wss/ffbab7de-37e1-4863-9c22-41ef50fc0bfb/T91-Sistema+Especial.pdf?MOD=AJPERES
-            "exclusion_cotizacion": linea[
-                36:39
-            ],  # Lista codigos https://www.seg-social.es/wps/wcm/connect/wss/23627250-475b-4516-811f-2781422efcdb/T52-Tipo+de+Relaci%C3%B3n+Laboral+2022-09.pdf?MOD=AJPERES
-            "cambio_puesto_trabajo": linea[
-                39:41
-            ],  # Lista codigos https://www.seg-social.es/wps/wcm/connect/wss/0be0df0d-3b4b-41e2-b14b-d0e1a1929ff8/T73-Cambio+de+puesto+de+trabajo.pdf?MOD=AJPERES
-            "indicativo_perdida_beneficios": linea[
-                41:43
-            ],  # Para acción MC se admitirán todos los valores. Para acción MA solo los valores: 01=falta de concurrencia de requisitos; 08=extinción contrato bonificado últimos 12 meses y 99=no aplicación peculiaridades vigentes.
-            "vinculo_familiar": linea[
-                43:44
-            ],  # Uso futuro, lista https://www.seg-social.es/wps/wcm/connect/wss/8225d8d4-e6fa-42bf-97a7-1d1efecd0380/T97-V%C3%ADnculo+familiar+2023-08.pdf?MOD=AJPERES
-            "nss_persona_fisica_vinculada": linea[44:56],
-            "programa_formento_empleo_agrario": linea[
-                56:57
-            ],  # Valores: 0=No; 1=Sí; 2=Sí, con exclusión de cotización adicional contratos inferiores a 30 días
-            "modalidad_cotizacion": linea[
-                57:58
-            ],  # Obligatorio para altas de Régimen 0613. No admisible para otros regímenes. Valores: 0=sin modalidad de cotización; 1=cotización mensual; 2=cotización por jornadas reales.
-            "beneficios": linea[
-                58:60
-            ],  # Valor: 01=Beneficiario Sistema Nacional de Garantía Juvenil – solicitado. 11 = Beneficiario Sistema Nacional de Garantía Juvenil – acreditado.16 - Benef. SNGJ-Baja cualificación; 17 - Ceuta y Melilla; 18 - Formación práctica Coop.-Soc. Laboral. 19=Ct formación Art.23 RDL 1/2023; 20=Transf. Ct fijo disc. SEA Art. 29 RDL 1/2023; 21= Incorporación socios coop/soc lab. Art 28 RDL 1/2023
-            "ocupacion": linea[
-                60:62
-            ],  # Lista https://www.seg-social.es/wps/wcm/connect/wss/7738be41-3c14-4a2e-8a0a-b55ddbc8ded6/T58-Ocupaci%C3%B3n.pdf?MOD=AJPERES
-            "excedente_sector_industrial": linea[
-                62:64
-            ],  # 1=Textil. Confección; 2=Calzado. Curtidos. Marroquinería.
-            "reduccion_jornada": linea[64:67],
-            "coeficiente_tiempo_parcial_inicial": linea[67:70],
-        }
-
-    def parse_linea_odl(self, fila, linea):
-        """
-        Parsea la linea de Otros Datos Laborales
+        cabecera, *codigos = EXTRACTOR_PES(linea)
+        # Se resuelven las 33 peculiaridades de una vez, solo si alguna no es válida
+        # se valida sección a sección para informar del error concreto
+        etiquetadas = list(map(PECULIARIDADES_ETIQUETADAS.get, codigos))
+        if None in etiquetadas:
+            return self.parse_linea_pes_secciones(fila, linea)
+        return RegistroPes(intern(cabecera), *etiquetadas)
+
+    parse_linea_tra = _generar_parser(
+        "TRA", "parse_linea_tra", "Parsea la línea de TRAbajador"
+    )
+
+    parse_linea_ayn = _generar_parser(
+        "AYN", "parse_linea_ayn", "Parsea la línea Apellidos Y Nombre"
+    )
+
+    parse_linea_dom = _generar_parser(
+        "DOM",
+        "parse_linea_dom",
+        "Parsea la línea de DOMicilio, todos los paramentros menos la cabecera son opcionales",
+    )
+
+    parse_linea_ldd = _generar_parser(
+        "LDD", "parse_linea_ldd", "Parsea la linea de Localidad Domicilio Decodificado"
+    )
+
+    parse_linea_fab = _generar_parser(
+        "FAB", "parse_linea_fab", "Parsea la linea de Fecha Alta Baja"
+    )
+
+    parse_linea_dam = _generar_parser(
+        "DAM", "parse_linea_dam", "Parsea la linea de Datos Asociados al Movimiento"
+    )
+
+    parse_linea_odl = _generar_parser(
+        "ODL", "parse_linea_odl", "Parsea la linea de Otros Datos Laborales"
+    )
+
+    # Tabla de despacho por cabecera. Es de clase y guarda funciones, no métodos
+    # enlazados, para no crearla en cada instancia ni generar una referencia circular
+    # (instancia -> diccionario -> métodos -> instancia) que retrase su liberación.
+    PARSERS = {
+        "ETI": parse_linea_eti,
+        "EMP": parse_linea_emp,
+        "RZS": parse_linea_rzs,
+        "PES": parse_linea_pes,
+        "TRA": parse_linea_tra,
+        "AYN": parse_linea_ayn,
+        "DOM": parse_linea_dom,
+        "LDD": parse_linea_ldd,
+        "FAB": parse_linea_fab,
+        "DAM": parse_linea_dam,
+        "ODL": parse_linea_odl,
+    }
+
+
+def _parsear_bloque(clase, nombre_archivo, fila_inicio, lineas):
+    """
+    Parsea un bloque de líneas en un proceso de `AfiArchivo.parsear_paralelo`.
 
-        Args:
-            fila (int): Número de línea actual.
-            linea (str): Contenido de la línea.
+    Args:
+        clase (type): Clase de la instancia que parsea en paralelo (AfiArchivo o una
+            subclase), para usar sus mismos parsers.
+        nombre_archivo (str): Nombre del archivo al que pertenece el bloque.
+        fila_inicio (int): Número de fila de la primera línea del bloque.
+        lineas (list[str]): Líneas del bloque.
 
-        Returns:
-            Diccionario con el contenido de la línea separado por secciones.
-        """
-        cabecera = linea[0:3]  # Siempre ODL
-        convenio_colectivo = self.validar_numeros(
-            self.nombre, linea[3:17], "convenio_colectivo", fila, 3
-        )  # txt de los codigos de convenios colectivos a 2016/03 https://www.seg-social.es/descarga/es/214684
-        reservado_1 = linea[17:23]
-        ocupacion_cno = self.validar_numeros(
-            self.nombre, linea[23:27], "ocupacion_cno", fila, 23
-        )  # Lista codigos https://www.seg-social.es/wps/wcm/connect/wss/43c07033-9bc6-43e0-acca-fea462663adf/T90-TABLA+DE+OCUPACI%C3%93N+C.N.O.+2022-12.pdf?MOD=AJPERES
-        reservado_2 = self.validar_numeros(
-            self.nombre, linea[27:33], "reservado_2", fila, 27
-        )
-        importe_contribucion_entero = self.validar_numeros(
-            self.nombre, linea[33:37], "importe_contribucion_entero", fila, 33
-        )
-        importe_contribucion_decimal = self.validar_numeros(
-            self.nombre, linea[37:39], "importe_contribucion_decimal", fila, 37
-        )
-        entidad_plan_pensiones = linea[
-            39:44
-        ]  # Obligatorio para SAA 439 para acción ASA; opcional para acción MSA; no admisible para ESA. Ver tabla https://www.seg-social.es/wps/wcm/connect/wss/d2256385-d5fe-40b1-ad5a-58b1bedb51af/T100+-+Entidad+gestora+del+Plan+de+pensiones+2025-06.pdf?MOD=AJPERES
-        pais = self.validar_numeros(
-            self.nombre, linea[44:47], "importe_contribucion_decimal", fila, 44
-        )  # Obligatorio para SAA 150, 151, 152, 153 y 154 para acciones ASA y MSA; no admisible para ESA. Ver tabla https://www.seg-social.es/wps/wcm/connect/wss/b2a14538-73e9-4e9b-ae81-82e50ec0090b/T12-Nacionalidad+Pais+2021-09.pdf?MOD=AJPERES
-        region_especial_pais = linea[47:50]  # En desuso
-        fin_previsto_contrato = self.validar_numeros(
-            self.nombre, linea[50:58], "importe_contribucion_decimal", fila, 50
-        )  # En desuso
-        reservado_3 = linea[58:70]  # En desuso
-
-        return {
-            "cabecera": cabecera,
-            "convenio_colectivo": convenio_colectivo,
-            "reservado_1": reservado_1,
-            "ocupacion_cno": ocupacion_cno,
-            "reservado_2": reservado_2,
-            "importe_contribucion_entero": importe_contribucion_entero,
-            "importe_contribucion_decimal": importe_contribucion_decimal,
-            "entidad_plan_pensiones": entidad_plan_pensiones,
-            "pais": pais,
-            "region_especial_pais": region_especial_pais,
-            "fin_previsto_contrato": fin_previsto_contrato,
-            "reservado_3": reservado_3,
-        }
+    Returns:
+        tuple[list, list[str]]: Registros parseados y errores del bloque.
+    """
+    afi = clase(nombre_archivo, lineas)
+    resultados = [registro for _, registro in afi.iterar_parseo(fila_inicio)]
+    return resultados, afi.errores_parseo
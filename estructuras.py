@@ -0,0 +1,345 @@
+"""Estructuras de ancho fijo de cada tipo de línea (cabecera) de un archivo AFI"""
+
+# Cada estructura es una tupla de (nombre_seccion, ancho) en el mismo orden en el que
+# aparecen las secciones en la línea, de forma que la posición de cada sección se
+# obtiene acumulando los anchos anteriores.
+
+from operator import itemgetter
+
+# ETIquetas de inicio
+ETI = (
+    ("cabecera", 3),  # Siempre ETI
+    ("sintaxis", 4),
+    ("version_mensaje", 1),
+    ("id_programa", 4),
+    ("version_proceso", 1),
+    ("clave_autorizacion", 8),
+    ("reservado_1", 8),
+    ("fecha", 8),
+    ("hora", 4),
+    ("nombre_archivo", 8),
+    ("extension_archivo", 3),
+    ("prioridad", 1),
+    ("indicador_prueba", 1),
+    # Debe estar vacío, P es prueba, N es no sustitutivo;
+    # "Solo afecta a las liquidaciones complementarias del tipo
+    # L02, L03, L09 (del mes en curso no), L13, TP2 y A76.
+    # Cuando venga consignada esta marca, no se procederá
+    # a la sustitución automática de estas liquidaciones por otras
+    # presentadas en el mismo período y con idéntico CCC, período
+    # de liquidación y tipo de liquidación."
+    ("id_registro_ano", 2),
+    ("id_registro_mes", 2),
+    ("id_registro_serie", 1),
+    ("id_registro_envio", 5),
+    # Refiere a dentro del lote (num envio), el orden del archivo (i.e. envio 3 archivo 2)
+    ("id_registro_ordinal", 4),
+    ("reservado_2", 1),
+    ("reservado_3", 1),
+)
+
+# EMPresa
+EMP = (
+    ("cabecera", 3),  # Siempre EMP
+    ("seguridad_social_regimen", 4),
+    ("seguridad_social_provincia", 2),
+    ("seguridad_social_numero", 9),
+    ("empresario_tipo_identificacion", 1),
+    ("empresario_codigo_pais", 3),
+    ("empresario_numero_identificacion", 14),  # Padding a la izquierda de ceros
+    ("empresario_calificador", 2),  # Opcional, subcif
+    ("ccc_regimen", 4),
+    ("ccc_provincia", 2),
+    ("ccc_numero", 9),  # Codigo Cuenta Cotización (CCC)
+    ("reservado_recaudacion", 13),
+    ("accion", 3),
+    ("reservado", 1),
+)
+
+# RaZón Social
+RZS = (
+    ("cabecera", 3),  # Siempre RZS
+    ("indicador_rzs", 1),  # Reservado
+    ("tipo_alfabetico", 1),
+    ("razon_social", 55),
+    ("clave_autorizacion", 8),  # Para acción CTA, número de autorización
+    ("reservado", 2),
+)
+
+# PEculiaridades Solicitadas, peculiaridad_1 a peculiaridad_33
+PES = (("cabecera", 3),) + tuple(  # Siempre PES
+    (f"peculiaridad_{i}", 2) for i in range(1, 34)
+)
+
+# TRAbajador
+TRA = (
+    ("cabecera", 3),  # Siempre TRA
+    ("ss_provincia", 2),
+    ("ss_numero", 10),
+    ("ipf_tipo", 1),
+    ("ipf_pais", 3),
+    ("ipf_alfaclave", 14),  # Padding a la izquierda de ceros
+    ("reservado_respuesta_afi", 3),
+    ("reservado_recaudacion", 25),
+    ("nacionalidad", 3),  # Opcional para DNI
+    ("indicador_trabajador", 1),  # Reservado para futuro uso versión 9.6
+    ("reservado", 5),
+)
+
+# Apellidos Y Nombre
+AYN = (
+    ("cabecera", 3),  # Siempre AYN
+    ("primer_apellido", 20),
+    ("segundo_apellido", 20),
+    ("nombre", 15),
+    ("reservado", 12),
+)
+
+# DOMicilio, todos los parametros menos la cabecera son opcionales
+DOM = (
+    ("cabecera", 3),  # Siempre DOM
+    ("indicador_domicilio", 1),  # Reservado para uso futuro
+    ("dom_tipo_via", 2),
+    ("dom_nombre_via", 36),
+    ("dom_numero", 5),  # Solo números
+    ("dom_bis", 2),
+    ("dom_bloque", 2),
+    ("dom_escalera", 2),
+    ("dom_piso", 2),
+    ("dom_puerta", 3),
+    ("telefono", 10),  # 10 dígitos, padding de ceros a la izquierda
+    ("reservado", 2),
+)
+
+# Localidad Domicilio Decodificado
+LDD = (
+    ("cabecera", 3),  # Siempre LDD
+    ("codigo_postal", 5),
+    ("localidad", 40),
+    # Lista de provincias https://www.seg-social.es/wps/wcm/connect/wss/99d52a02-2968-4f38-b594-290ce13c29fb/T62-Provincia.pdf?MOD=AJPERES
+    ("provincia", 2),
+    ("telefono_sms", 12),  # Solo para acciones MA o MB, left padding ceros
+    # https://es.wikipedia.org/wiki/Anexo:Prefijos_telefónicos_mundiales
+    ("prefijo_pais", 3),  # Solo para acciones MA o MB
+    ("reservado", 5),
+)
+
+# Fecha Alta Baja
+FAB = (
+    ("cabecera", 3),  # Siempre FAB
+    # Lista de acciones https://www.seg-social.es/wps/wcm/connect/wss/dad0574d-411d-4d69-b78f-9d7947ceabab/T07-Acci%C3%B3n+2024-02.pdf?MOD=AJPERES
+    ("accion", 3),
+    # Lista de situaciones https://www.seg-social.es/wps/wcm/connect/wss/ac6c2087-f6d7-4f62-8f85-64c574a6698c/T21-Situaci%C3%B3n+2023-11.pdf?MOD=AJPERES
+    ("situacion", 2),
+    ("fecha_real", 8),
+    # Lista de grupos de cotizacion https://www.seg-social.es/wps/wcm/connect/wss/d9ea5c7f-8bf6-41a7-91b6-daabaf67d371/T18-Grupo+de+cotizaci%C3%B3n.pdf?MOD=AJPERES
+    ("grupo_cotizacion", 2),
+    ("grupo_cotizacion_diario", 1),  # Booleano S/N
+    ("grado_discapacidad", 2),
+    # Lista de contratos https://www.seg-social.es/wps/wcm/connect/wss/53104a0c-a484-4728-948f-7355385cf99d/T19-Clave+de+Contrato+de+trabajo+2023-01.pdf?MOD=AJPERES
+    ("tipo_contrato", 3),
+    # Lista de condiciones de desempleo https://www.seg-social.es/wps/wcm/connect/wss/ea63cb12-6a21-4d27-9e14-87fa971c938d/T37-Condici%C3%B3n+de+desempleado+2023-08.pdf?MOD=AJPERES
+    ("condicion_desempleado", 1),
+    ("mujer_subrepresentada", 1),  # Booleano S/N
+    ("coeficiente_tiempo_parcial", 3),
+    # Listado de colectivos de trabajadores https://www.seg-social.es/wps/wcm/connect/wss/81619dd8-3725-4f83-92aa-325b8202fadc/T61-Colectivo+de+trabajador+2022-06.pdf?MOD=AJPERES
+    ("colectivo_trabajador", 3),
+    # Espacio = No Impresión; S = Impresión resolución; C = Impresión resolución + IDC; I=IDC.
+    ("indicador_impresion", 1),
+    # Obligatorio para Régimen 0911. Opcional para Régimen Especial de Trabajadores del Mar. No admisible para resto de regímenes.
+    ("categoria_profesional", 7),
+    ("fecha_nacimiento", 8),
+    ("sexo", 1),  # 1 hombre 2 mujer
+    ("reservado", 1),
+    # 5 = Extranjero obligación retorno país origen; 6 = Cese de actividad.
+    ("cese_actividad", 1),
+    ("coeficiente_huelga_ere", 3),
+    # S= Mujer reincorporada después de maternidad; 2=Superposición por 2ªreincorporación; 3=5 años de inactividad; 4=Mujer reincorporada después de excedencia.
+    ("mujer_reincorporada", 1),
+    # Lista codigos https://www.seg-social.es/wps/wcm/connect/wss/59269e17-bb97-4c60-8ced-3bb5fa6a1ba6/T101+-+Incapacitado+readmitido+2023-08.pdf?MOD=AJPERES
+    ("incapacitado_readmitido", 1),
+    # S= Sí; 1= Familiar 2º grado. Bonificación Ley 6/2017.
+    ("trabajador_autonomo", 1),
+    # Booleano S/N. El campo “5JR/semana según convenio” deberá cumplimentarse en aquellos casos en los que el convenio colectivo que resulte de aplicación al trabajador, le permita realizar para un mismo empresario, un mínimo de 5 jornadas reales semanales.
+    ("cinco_jr_semana", 1),
+    # 1= Empresa <50 Trabajadores (Contrato emprendedores); 3=Menos de 10 trabajadores.
+    ("n_trabajadores_empresa", 1),
+    # Lista relaciones laborales especiales https://www.seg-social.es/wps/wcm/connect/wss/378ec2c8-09d4-43d2-a027-5a31d29b5b2c/T38-Relaci%C3%B3n+Laboral+de+Car%C3%A1cter+Especial+2025-05.pdf?MOD=AJPERES
+    ("relacion_laboral_especial", 4),
+    # Lista tipos de inactividad https://www.seg-social.es/wps/wcm/connect/wss/08f5f0c8-8745-4872-82ff-d123ddef5cc3/T41-Tipos+de+inactividad+2025-05.pdf?MOD=AJPERES
+    ("tipo_inactividad", 2),
+    ("responsable_formacion", 1),  # Booleano S/N
+    ("exenciones_trabajador", 1),  # Booleano S/N
+    # Lista codigos https://www.seg-social.es/wps/wcm/connect/wss/f17bc7b7-7d13-40e8-9d89-b17d8f1776b9/T83-Exclusi%C3%B3n+social-V%C3%ADctimas+2024-11.pdf?MOD=AJPERES
+    ("exclusion_social_victimas", 1),
+    ("renta_activa_insercion", 1),  # Booleano S/N
+    ("trabajadoras_24m_alumbramiento", 1),  # Booleano S/N
+)
+
+# Datos Asociados al Movimiento
+DAM = (
+    ("cabecera", 3),  # Siempre DAM
+    ("fecha_inicio_contrato", 8),
+    # Obigatorio si fecha_inicio_contrato contiene algo, booleano S/N
+    ("fic_especifico", 1),
+    ("nuss_trabajador_sustituido", 12),
+    # Obigatorio si nuss_trabajador_sustituido contiene algo (solo para sistema especial 32), lista causas https://www.seg-social.es/wps/wcm/connect/wss/333d95d6-b3a4-4b6c-89ac-cd888ac68c79/T39-Causa+de+sustituci%C3%B3n+2025-05.pdf?MOD=AJPERES
+    ("causa_sustitucion", 2),
+    ("permanencia_parte_entera", 1),  # De existir debe ser 1
+    ("permamencia_parte_decimal", 2),  # De existir debe ser 33 o 61
+    # Solo para altas en regimenes 0111, 0811 y 0911
+    ("coeficiente_reductor_jubilacion", 2),
+    ("relevo", 1),
+    ("dias_trabajados", 2),
+    # Desuso, tabla https://www.seg-social.es/wps/wcm/connect/wss/ffbab7de-37e1-4863-9c22-41ef50fc0bfb/T91-Sistema+Especial.pdf?MOD=AJPERES
+    ("sistema_especial", 2),
+    # Lista codigos https://www.seg-social.es/wps/wcm/connect/wss/23627250-475b-4516-811f-2781422efcdb/T52-Tipo+de+Relaci%C3%B3n+Laboral+2022-09.pdf?MOD=AJPERES
+    ("exclusion_cotizacion", 3),
+    # Lista codigos https://www.seg-social.es/wps/wcm/connect/wss/0be0df0d-3b4b-41e2-b14b-d0e1a1929ff8/T73-Cambio+de+puesto+de+trabajo.pdf?MOD=AJPERES
+    ("cambio_puesto_trabajo", 2),
+    # Para acción MC se admitirán todos los valores. Para acción MA solo los valores: 01=falta de concurrencia de requisitos; 08=extinción contrato bonificado últimos 12 meses y 99=no aplicación peculiaridades vigentes.
+    ("indicativo_perdida_beneficios", 2),
+    # Uso futuro, lista https://www.seg-social.es/wps/wcm/connect/wss/8225d8d4-e6fa-42bf-97a7-1d1efecd0380/T97-V%C3%ADnculo+familiar+2023-08.pdf?MOD=AJPERES
+    ("vinculo_familiar", 1),
+    ("nss_persona_fisica_vinculada", 12),
+    # Valores: 0=No; 1=Sí; 2=Sí, con exclusión de cotización adicional contratos inferiores a 30 días
+    ("programa_formento_empleo_agrario", 1),
+    # Obligatorio para altas de Régimen 0613. No admisible para otros regímenes. Valores: 0=sin modalidad de cotización; 1=cotización mensual; 2=cotización por jornadas reales.
+    ("modalidad_cotizacion", 1),
+    # Valor: 01=Beneficiario Sistema Nacional de Garantía Juvenil – solicitado. 11 = Beneficiario Sistema Nacional de Garantía Juvenil – acreditado.16 - Benef. SNGJ-Baja cualificación; 17 - Ceuta y Melilla; 18 - Formación práctica Coop.-Soc. Laboral. 19=Ct formación Art.23 RDL 1/2023; 20=Transf. Ct fijo disc. SEA Art. 29 RDL 1/2023; 21= Incorporación socios coop/soc lab. Art 28 RDL 1/2023
+    ("beneficios", 2),
+    # Lista https://www.seg-social.es/wps/wcm/connect/wss/7738be41-3c14-4a2e-8a0a-b55ddbc8ded6/T58-Ocupaci%C3%B3n.pdf?MOD=AJPERES
+    ("ocupacion", 2),
+    # 1=Textil. Confección; 2=Calzado. Curtidos. Marroquinería.
+    ("excedente_sector_industrial", 2),
+    ("reduccion_jornada", 3),
+    ("coeficiente_tiempo_parcial_inicial", 3),
+)
+
+# Otros Datos Laborales
+ODL = (
+    ("cabecera", 3),  # Siempre ODL
+    # txt de los codigos de convenios colectivos a 2016/03 https://www.seg-social.es/descarga/es/214684
+    ("convenio_colectivo", 14),
+    ("reservado_1", 6),
+    # Lista codigos https://www.seg-social.es/wps/wcm/connect/wss/43c07033-9bc6-43e0-acca-fea462663adf/T90-TABLA+DE+OCUPACI%C3%93N+C.N.O.+2022-12.pdf?MOD=AJPERES
+    ("ocupacion_cno", 4),
+    ("reservado_2", 6),
+    ("importe_contribucion_entero", 4),
+    ("importe_contribucion_decimal", 2),
+    # Obligatorio para SAA 439 para acción ASA; opcional para acción MSA; no admisible para ESA. Ver tabla https://www.seg-social.es/wps/wcm/connect/wss/d2256385-d5fe-40b1-ad5a-58b1bedb51af/T100+-+Entidad+gestora+del+Plan+de+pensiones+2025-06.pdf?MOD=AJPERES
+    ("entidad_plan_pensiones", 5),
+    # Obligatorio para SAA 150, 151, 152, 153 y 154 para acciones ASA y MSA; no admisible para ESA. Ver tabla https://www.seg-social.es/wps/wcm/connect/wss/b2a14538-73e9-4e9b-ae81-82e50ec0090b/T12-Nacionalidad+Pais+2021-09.pdf?MOD=AJPERES
+    ("pais", 3),
+    ("region_especial_pais", 3),  # En desuso
+    ("fin_previsto_contrato", 8),  # En desuso
+    ("reservado_3", 12),  # En desuso
+)
+
+ESTRUCTURAS = {
+    "ETI": ETI,
+    "EMP": EMP,
+    "RZS": RZS,
+    "PES": PES,
+    "TRA": TRA,
+    "AYN": AYN,
+    "DOM": DOM,
+    "LDD": LDD,
+    "FAB": FAB,
+    "DAM": DAM,
+    "ODL": ODL,
+}
+
+# Secciones que casi siempre contienen el mismo valor (constantes, relleno de reserva
+# o códigos de tablas pequeñas). Se internan para que todas las líneas compartan el
+# mismo objeto str en lugar de guardar una copia por línea.
+SECCIONES_REPETIDAS = frozenset(
+    {
+        "cabecera",
+        "sintaxis",
+        "extension_archivo",
+        "empresario_calificador",
+        "accion",
+        "situacion",
+        "grupo_cotizacion",
+        "grado_discapacidad",
+        "tipo_contrato",
+        "coeficiente_tiempo_parcial",
+        "colectivo_trabajador",
+        "categoria_profesional",
+        "coeficiente_huelga_ere",
+        "relacion_laboral_especial",
+        "tipo_inactividad",
+        "causa_sustitucion",
+        "exclusion_cotizacion",
+        "beneficios",
+        "ocupacion",
+        "reduccion_jornada",
+        "coeficiente_tiempo_parcial_inicial",
+        "prefijo_pais",
+    }
+)
+
+
+def calcular_posiciones(estructura):
+    """
+    Calcula la posición (índice de inicio) de cada sección dentro de la línea.
+
+    Args:
+        estructura (tuple[tuple[str, int], ...]): Secciones de la línea y su ancho.
+
+    Returns:
+        dict[str, int]: Diccionario que mapea cada sección a su posición.
+    """
+    posiciones = {}
+    inicio = 0
+    for nombre, ancho in estructura:
+        posiciones[nombre] = inicio
+        inicio += ancho
+    return posiciones
+
+
+def secciones_repetidas(estructura):
+    """
+    Obtiene las secciones de una estructura que conviene internar.
+
+    Las secciones de un solo carácter no se incluyen porque Python ya comparte
+    esos strings.
+
+    Args:
+        estructura (tuple[tuple[str, int], ...]): Secciones de la línea y su ancho.
+
+    Returns:
+        tuple[int, ...]: Índices de las secciones repetidas o reservadas.
+    """
+    return tuple(
+        indice
+        for indice, (nombre, ancho) in enumerate(estructura)
+        if ancho > 1
+        and (nombre in SECCIONES_REPETIDAS or nombre.startswith("reservado"))
+    )
+
+
+def crear_extractor(estructura):
+    """
+    Crea las herramientas para separar una línea en todas sus secciones de una sola vez.
+
+    Args:
+        estructura (tuple[tuple[str, int], ...]): Secciones de la línea y su ancho.
+
+    Returns:
+        callable: Dada una línea, devuelve una tupla con el texto de cada sección.
+    """
+    posiciones = calcular_posiciones(estructura)
+    cortes = [
+        slice(posiciones[nombre], posiciones[nombre] + ancho)
+        for nombre, ancho in estructura
+    ]
+    return itemgetter(*cortes)
+
+
+# Índices de las secciones a internar de cada cabecera
+REPETIDAS = {
+    cabecera: secciones_repetidas(estructura)
+    for cabecera, estructura in ESTRUCTURAS.items()
+}
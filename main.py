@@ -9,9 +9,74 @@ mirar el numero de tabla en el enlace y buscar
 """
 
 import os
-from afi_archivo import AfiArchivo
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from operator import itemgetter
+from afi_archivo import MIN_LINEAS_BLOQUE, MIN_LINEAS_PARALELO, AfiArchivo
 from validaciones import LongitudLineaError
 
+# Bytes de una línea AFI (70 caracteres y el salto de línea), para estimar el número de
+# líneas de un archivo por su tamaño sin leerlo
+BYTES_POR_LINEA = 71
+
+
+def _entradas_afi(ruta_carpeta):
+    """
+    Busca los archivos con extensión '.afi' de una carpeta, sin leerlos.
+
+    Args:
+        ruta_carpeta (str): Ruta de la carpeta donde buscar los archivos '.afi'.
+
+    Returns:
+        list[os.DirEntry]: Entradas de los archivos encontrados.
+    """
+    with os.scandir(ruta_carpeta) as entradas:
+        return [
+            entrada
+            for entrada in entradas
+            if entrada.name.lower().endswith(".afi") and entrada.is_file()
+        ]
+
+
+def _leer_lineas(ruta):
+    """
+    Lee las líneas de un archivo '.afi'.
+
+    Args:
+        ruta (str): Ruta del archivo.
+
+    Returns:
+        list[str]: Líneas del archivo, sin el carácter de nueva línea.
+    """
+    with open(ruta, "r", encoding="utf-8") as f:
+        # Una sola lectura y un solo recorrido
+        lineas = f.read().split("\n")
+    if lineas[-1] == "":  # Salto de línea final (o archivo vacío)
+        lineas.pop()
+    return lineas
+
+
+def iterar_afi_desde_carpeta(ruta_carpeta="afi", entradas=None):
+    """
+    Recorre los archivos con extensión '.afi' de una carpeta, leyéndolos de uno en uno
+    para no tener todos en memoria a la vez.
+
+    Args:
+        ruta_carpeta (str, optional): Ruta de la carpeta donde buscar los archivos '.afi'.
+            Por defecto es "afi".
+        entradas (list[os.DirEntry], optional): Archivos ya encontrados en la carpeta,
+            para no volver a recorrerla. Por defecto se buscan en `ruta_carpeta`.
+
+    Yields:
+        tuple[str, list[str]]: Nombre de cada archivo y sus líneas, sin el carácter de
+        nueva línea.
+    """
+    if entradas is None:
+        entradas = _entradas_afi(ruta_carpeta)
+    for entrada in entradas:
+        yield entrada.name, _leer_lineas(entrada.path)
+
 
 def cargar_afi_desde_carpeta(ruta_carpeta="afi"):
     """
@@ -25,61 +90,163 @@ def cargar_afi_desde_carpeta(ruta_carpeta="afi"):
         dict: Un diccionario donde las claves son los nombres de archivo y los valores
         son listas de líneas del archivo, sin el carácter de nueva línea.
     """
-    afi_files = {}
-    for archivo in os.listdir(ruta_carpeta):
-        if archivo.lower().endswith(".afi"):
-            ruta = os.path.join(ruta_carpeta, archivo)
-            with open(ruta, "r", encoding="utf-8") as f:
-                lineas = f.readlines()
-            afi_files[archivo] = [linea.rstrip("\n") for linea in lineas]
-    return afi_files
+    return dict(iterar_afi_desde_carpeta(ruta_carpeta))
+
+
+def procesar_archivo(archivo, lineas):
+    """
+    Valida la longitud de las líneas de un archivo y, si es correcta, lo parsea.
+    Es una función de módulo para poder ejecutarla en otros procesos.
+
+    Args:
+        archivo (str): Nombre del archivo.
+        lineas (list[str]): Líneas del archivo, sin el carácter de nueva línea.
+
+    Returns:
+        tuple[str | None, list, list[str]]: Error de longitud (None si no lo hay),
+        registros parseados y errores de parseo.
+    """
+    afi = AfiArchivo(archivo, lineas)
+
+    # Validación de longitud
+    try:
+        afi.validar_longitud()
+    except LongitudLineaError as e:
+        return str(e), [], []  # Saltar este archivo
+
+    # Intentar parsear todo el archivo
+    afi.parsear()
+    return None, afi.resultados, afi.errores_parseo
+
+
+def procesar_lote(lote):
+    """
+    Procesa un lote de archivos con `procesar_archivo`, en un mismo proceso.
+
+    Args:
+        lote (list[tuple[str, list[str]]]): Nombre y líneas de cada archivo.
+
+    Returns:
+        list[tuple[str, tuple]]: Nombre y resultado de `procesar_archivo` de cada
+        archivo, en el mismo orden.
+    """
+    return [(archivo, procesar_archivo(archivo, lineas)) for archivo, lineas in lote]
+
+
+def agrupar_en_lotes(archivos, min_lineas):
+    """
+    Agrupa archivos consecutivos en lotes de al menos `min_lineas` líneas (salvo el
+    último), para que cada envío a otro proceso compense su coste.
+
+    Args:
+        archivos (Iterable[tuple[str, list[str]]]): Nombre y líneas de cada archivo.
+        min_lineas (int): Mínimo de líneas de cada lote.
+
+    Yields:
+        list[tuple[str, list[str]]]: Lotes de archivos, en orden.
+    """
+    lote = []
+    lineas_lote = 0
+    for archivo, lineas in archivos:
+        lote.append((archivo, lineas))
+        lineas_lote += len(lineas)
+        if lineas_lote >= min_lineas:
+            yield lote
+            lote = []
+            lineas_lote = 0
+    if lote:
+        yield lote
+
+
+def procesar_en_paralelo(lotes, procesos):
+    """
+    Procesa lotes de archivos con `procesar_lote` en varios procesos. Solo se envían
+    lotes mientras haya menos de dos por proceso sin recoger, así que los archivos se
+    leen a medida que se van procesando y no todos antes de empezar.
+
+    Args:
+        lotes (Iterable[list[tuple[str, list[str]]]]): Lotes de archivos (ver
+            `agrupar_en_lotes`).
+        procesos (int): Número de procesos.
+
+    Yields:
+        tuple[str, tuple]: Nombre y resultado de `procesar_archivo` de cada archivo, en
+        el orden de los lotes.
+    """
+    pendientes = deque()
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        for lote in lotes:
+            if len(pendientes) >= 2 * procesos:
+                yield from pendientes.popleft().result()
+            pendientes.append(ejecutor.submit(procesar_lote, lote))
+        while pendientes:
+            yield from pendientes.popleft().result()
+
+
+def mostrar_errores(errores):
+    """
+    Muestra una lista de errores agrupados por archivo.
+
+    Args:
+        errores (list[tuple[str, str, str]]): Errores como (archivo, tipo, mensaje),
+            con los de un mismo archivo consecutivos.
+    """
+    for archivo, grupo in groupby(errores, key=itemgetter(0)):
+        print(f"Archivo: {archivo}")
+        for _, _, mensaje in grupo:
+            print("  ", mensaje)
 
 
 def main():
     """
     Ejecuta el proceso principal:
     carga archivos, valida longitudes, parsea y muestra errores y resultados.
+    Los archivos son independientes, así que si hay más de una CPU y suficientes
+    líneas para compensar el coste de otros procesos, se procesan en paralelo por lotes.
     """
-    afi_data = cargar_afi_desde_carpeta()
-    errores_longitud = {}
-    errores_parseo = {}
+    entradas = _entradas_afi("afi")
+    # Cada archivo se lee justo antes de procesarlo (o de enviarlo a otro proceso)
+    archivos = iterar_afi_desde_carpeta(entradas=entradas)
+    lineas_estimadas = (
+        sum(entrada.stat().st_size for entrada in entradas) // BYTES_POR_LINEA
+    )
+    procesos = os.cpu_count() or 1
+    # Todos los errores en una sola lista de (archivo, tipo, mensaje), en el orden de
+    # los archivos; solo se agrupan por archivo al mostrarlos
+    errores = []
     resultados = {}
 
-    for archivo, lineas in afi_data.items():
-        afi = AfiArchivo(archivo, lineas)
-
-        # Validación de longitud
-        try:
-            afi.validar_longitud()
-        except LongitudLineaError as e:
-            errores_longitud[archivo] = [str(e)]
-            continue  # Saltar este archivo
+    if len(entradas) > 1 and procesos > 1 and lineas_estimadas >= MIN_LINEAS_PARALELO:
+        procesados = procesar_en_paralelo(
+            agrupar_en_lotes(archivos, MIN_LINEAS_BLOQUE), procesos
+        )
+    else:
+        procesados = (
+            (archivo, procesar_archivo(archivo, lineas)) for archivo, lineas in archivos
+        )
 
-        # Intentar parsear todo el archivo
-        afi.parsear()
+    for archivo, (error_longitud, registros, errores_archivo) in procesados:
+        if error_longitud is not None:
+            errores.append((archivo, "longitud", error_longitud))
+            continue
 
         # Guardar resultados y errores
-        resultados[archivo] = afi.resultados
-        if afi.errores_parseo:
-            errores_parseo[archivo] = afi.errores_parseo
+        resultados[archivo] = registros
+        errores.extend((archivo, "parseo", error) for error in errores_archivo)
 
     # Mostrar errores de longitud
+    errores_longitud = [error for error in errores if error[1] == "longitud"]
     if errores_longitud:
         print("Errores de longitud encontrados:")
-        for archivo, lista in errores_longitud.items():
-            print(f"Archivo: {archivo}")
-            for err in lista:
-                print("  ", err)
+        mostrar_errores(errores_longitud)
     else:
         print("No se encontraron errores de longitud.")
 
     # Mostrar errores de parseo
+    errores_parseo = [error for error in errores if error[1] == "parseo"]
     if errores_parseo:
         print("\nErrores de parseo encontrados:")
-        for archivo, lista in errores_parseo.items():
-            print(f"Archivo: {archivo}")
-            for err in lista:
-                print("  ", err)
+        mostrar_errores(errores_parseo)
     else:
         print("\nNo se encontraron errores de parseo.")
 
@@ -0,0 +1,110 @@
+"""Registros (namedtuple) con el resultado de parsear cada tipo de línea de un archivo AFI"""
+
+# Cada registro tiene como campos las secciones de la estructura de su cabecera, en el
+# mismo orden. Al ser tuplas ocupan bastante menos memoria que un diccionario por línea;
+# para obtener un diccionario se puede usar `registro._asdict()`.
+# Las secciones se guardan tal cual vienen en la línea; las conversiones (por ejemplo a
+# fecha) solo se hacen cuando se piden, para no pagarlas en cada línea parseada.
+
+from collections import namedtuple
+from datetime import datetime
+import estructuras
+
+
+class Registro:
+    """Métodos comunes a todos los registros, que convierten secciones bajo demanda."""
+
+    __slots__ = ()
+
+    def como_fecha(self, nombre_seccion):
+        """
+        Convierte una sección con formato AAAAMMDD a fecha.
+
+        Args:
+            nombre_seccion (str): Nombre de la sección a convertir.
+
+        Raises:
+            ValueError: Si la sección no es una fecha válida.
+
+        Returns:
+            date | None: La fecha, o None si la sección está vacía o rellena de ceros.
+        """
+        texto = getattr(self, nombre_seccion)
+        if texto.strip(" 0") == "":
+            return None
+        return datetime.strptime(texto, "%Y%m%d").date()
+
+    def como_fecha_hora(self, nombre_fecha, nombre_hora):
+        """
+        Combina una sección de fecha (AAAAMMDD) y otra de hora (HHMM).
+
+        Args:
+            nombre_fecha (str): Nombre de la sección con la fecha.
+            nombre_hora (str): Nombre de la sección con la hora.
+
+        Raises:
+            ValueError: Si las secciones no forman una fecha y hora válidas.
+
+        Returns:
+            datetime | None: La fecha y hora, o None si la fecha está vacía.
+        """
+        fecha = self.como_fecha(nombre_fecha)
+        if fecha is None:
+            return None
+        hora = datetime.strptime(getattr(self, nombre_hora), "%H%M").time()
+        return datetime.combine(fecha, hora)
+
+
+def _crear_registro(nombre, estructura, descripcion):
+    """
+    Crea la clase de registro de una cabecera a partir de su estructura.
+
+    Args:
+        nombre (str): Nombre de la clase.
+        estructura (tuple[tuple[str, int], ...]): Secciones de la línea y su ancho.
+        descripcion (str): Docstring de la clase.
+
+    Returns:
+        type: Subclase de tuple con un campo por sección y los métodos de Registro.
+    """
+    campos = namedtuple(nombre, [seccion for seccion, _ in estructura])
+    return type(nombre, (campos, Registro), {"__slots__": (), "__doc__": descripcion})
+
+
+RegistroEti = _crear_registro("RegistroEti", estructuras.ETI, "Línea de ETIquetas")
+RegistroEmp = _crear_registro("RegistroEmp", estructuras.EMP, "Línea de EMPresa")
+RegistroRzs = _crear_registro("RegistroRzs", estructuras.RZS, "Línea de RaZón Social")
+RegistroPes = _crear_registro(
+    "RegistroPes", estructuras.PES, "Línea de PEculiaridades Solicitadas"
+)
+RegistroTra = _crear_registro("RegistroTra", estructuras.TRA, "Línea de TRAbajador")
+RegistroAyn = _crear_registro(
+    "RegistroAyn", estructuras.AYN, "Línea de Apellidos Y Nombre"
+)
+RegistroDom = _crear_registro("RegistroDom", estructuras.DOM, "Línea de DOMicilio")
+RegistroLdd = _crear_registro(
+    "RegistroLdd", estructuras.LDD, "Línea de Localidad Domicilio Decodificado"
+)
+RegistroFab = _crear_registro(
+    "RegistroFab", estructuras.FAB, "Línea de Fecha Alta Baja"
+)
+RegistroDam = _crear_registro(
+    "RegistroDam", estructuras.DAM, "Línea de Datos Asociados al Movimiento"
+)
+RegistroOdl = _crear_registro(
+    "RegistroOdl", estructuras.ODL, "Línea de Otros Datos Laborales"
+)
+
+REGISTROS = {
+    "ETI": RegistroEti,
+    "EMP": RegistroEmp,
+    "RZS": RegistroRzs,
+    "PES": RegistroPes,
+    "TRA": RegistroTra,
+    "AYN": RegistroAyn,
+    "DOM": RegistroDom,
+    "LDD": RegistroLdd,
+    "FAB": RegistroFab,
+    "DAM": RegistroDam,
+    "ODL": RegistroOdl,
+}
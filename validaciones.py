@@ -1,28 +1,96 @@
 """Módulo de validaciones de datos"""  # TODO agregar atributo obligatorio booleano y comprobar en el resto del codigo
 
 import re
+from functools import lru_cache
 from stdnum.es import cif
 
+# Caracteres que admite validar_letras: letras mayúsculas (incluidas las propias del
+# castellano) y espacios, que separan apellidos compuestos y rellenan la sección.
+CARACTERES_ALFABETICOS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZÁÉÍÓÚÜÑÇ ")
+
+# Expresiones regulares de cada tipo de documento, compiladas una sola vez
+REGEX_DNI = re.compile(r"^[0-9]{8}[A-Z]$")
+REGEX_NIE = re.compile(r"^[XYZ][0-9]{7}[A-Z]$")
+# Algo generalista, cubre pasaportes internacionales
+REGEX_PASAPORTE = re.compile(r"^[A-Z0-9]{6,9}$")
+
+# Validación de CIF con los resultados recientes en memoria: un mismo empresario aparece
+# en muchas líneas de un archivo y así no se recalcula el dígito de control cada vez
+cif_valido = lru_cache(maxsize=4096)(cif.is_valid)
+
+# Tipo de documento -> (comprobación del número, nombre del documento en los errores)
+COMPROBACIONES_DOCUMENTO = {
+    "1": (REGEX_DNI.match, "DNI"),
+    "2": (REGEX_PASAPORTE.match, "pasaporte"),
+    "6": (REGEX_NIE.match, "NIE"),
+    "9": (cif_valido, "CIF"),
+}
+
 
 class AfiError(Exception):
     """Excepción base para errores relacionados con archivos .afi."""
 
 
 class ValidacionError(AfiError):
-    """Excepción personalizada para errores de validación de datos."""
+    """
+    Excepción personalizada para errores de validación de datos.
+
+    Guarda los datos del error y solo construye el mensaje al convertirla a texto.
+    """
+
+    def __init__(self, archivo, fila, nombre_seccion, columna, seccion, motivo):
+        """
+        Args:
+            archivo (str): Nombre del archivo que se está procesando.
+            fila (int): Número de fila en el archivo.
+            nombre_seccion (str): Nombre legible de la sección.
+            columna (int): Índice de la sección dentro de la línea.
+            seccion (str): Texto de la sección que no es válida.
+            motivo (str): Por qué la sección no es válida.
+        """
+        super().__init__(archivo, fila, nombre_seccion, columna, seccion, motivo)
+
+    def __str__(self):
+        archivo, fila, nombre_seccion, columna, seccion, motivo = self.args
+        return (
+            f"Error en archivo '{archivo}', fila {fila}, sección '{nombre_seccion}' "
+            f"(pos {columna + 1}): '{seccion}' {motivo}"
+        )
 
 
 class LongitudLineaError(AfiError):
     """Excepción lanzada cuando una línea no cumple con la longitud esperada."""
 
 
+def etiquetas_diccionario(diccionario):
+    """
+    Devuelve, para cada clave de un diccionario de referencia, el resultado que da
+    validar_diccionario al validarla. Sirve para precalcularlos una sola vez para los
+    diccionarios fijos (los del módulo diccionarios) y no llamar al validador con las
+    secciones válidas.
+
+    Args:
+        diccionario (dict): Diccionario con claves válidas y sus etiquetas.
+
+    Returns:
+        dict[str, str]: Clave -> "clave('etiqueta')". Las claves en blanco no se
+        incluyen, ya que validar_diccionario nunca las da por válidas.
+    """
+    return {
+        clave: f"{clave}('{etiqueta}')"
+        for clave, etiqueta in diccionario.items()
+        if clave and not clave.isspace()
+    }
+
+
 class Validaciones:
     """Contiene métodos estáticos para realizar validaciones comunes sobre datos."""
 
     @staticmethod
     def validar_numeros(archivo, seccion, nombre_seccion, fila, columna):
         """
-        Valida que la sección sea un número (dígitos únicamente).
+        Valida que la sección sea un número (dígitos ASCII únicamente, no otros dígitos
+        Unicode como "²").
 
         Args:
             archivo (str): Nombre del archivo que se está procesando.
@@ -37,17 +105,22 @@ class Validaciones:
         Returns:
             str: La sección validada.
         """
-        if not seccion.isdigit():
+        if not (seccion.isascii() and seccion.isdigit()):
             raise ValidacionError(
-                f"Error en archivo '{archivo}', fila {fila}, sección '{nombre_seccion}' "
-                f"(pos {columna + 1}): '{seccion}' no es un número válido."
+                archivo,
+                fila,
+                nombre_seccion,
+                columna,
+                seccion,
+                "no es un número válido.",
             )
         return seccion
 
     @staticmethod
     def validar_letras(archivo, seccion, nombre_seccion, fila, columna):
         """
-        Valida que la sección sea un string estríctamente alfabético (string vacío es false).
+        Valida que la sección sea un string alfabético en mayúsculas, con espacios entre
+        palabras o de relleno (string vacío o en blanco es false).
 
         Args:
             archivo (str): Nombre del archivo que se está procesando.
@@ -62,10 +135,18 @@ class Validaciones:
         Returns:
             str: La sección validada.
         """
-        if not seccion.isalpha():
+        if (
+            not seccion
+            or seccion.isspace()
+            or not CARACTERES_ALFABETICOS.issuperset(seccion)
+        ):
             raise ValidacionError(
-                f"Error en archivo '{archivo}', fila {fila}, sección '{nombre_seccion}' "
-                f"(pos {columna + 1}): '{seccion}' no es una cadena exclusivamente alfabética."
+                archivo,
+                fila,
+                nombre_seccion,
+                columna,
+                seccion,
+                "no es una cadena exclusivamente alfabética.",
             )
         return seccion
 
@@ -89,36 +170,20 @@ class Validaciones:
         Returns:
             str: La sección validada.
         """
-        seccion = seccion.lstrip("0")  # Limpiar padding de ceros
+        # Limpiar padding de ceros (si no hay, lstrip devuelve la misma cadena sin copiarla)
+        seccion = seccion.lstrip("0")
         tipo = tipo[0]  # Ignorar texto de tipo
-        regex_dni = r"^[0-9]{8}[A-Z]$"
-        regex_nie = r"^[XYZ][0-9]{7}[A-Z]$"
-        regex_pasaporte = (
-            r"^[A-Z0-9]{6,9}$"  # Algo generalista, cubre pasaportes internacionales
-        )
-        if tipo == "1":  # DNI
-            if not re.match(regex_dni, seccion):
-                raise ValidacionError(
-                    f"Error en archivo '{archivo}', fila {fila}, sección '{nombre_seccion}' "
-                    f"(pos {columna + 1}): '{seccion}' no es un número de DNI válido."
-                )
-        elif tipo == "2":  # Pasaporte
-            if not re.match(regex_pasaporte, seccion):
+        comprobacion = COMPROBACIONES_DOCUMENTO.get(tipo)
+        if comprobacion is not None:
+            es_valido, documento = comprobacion
+            if not es_valido(seccion):
                 raise ValidacionError(
-                    f"Error en archivo '{archivo}', fila {fila}, sección '{nombre_seccion}' "
-                    f"(pos {columna + 1}): '{seccion}' no es un número de pasaporte válido."
-                )
-        elif tipo == "6":  # NIE
-            if not re.match(regex_nie, seccion):
-                raise ValidacionError(
-                    f"Error en archivo '{archivo}', fila {fila}, sección '{nombre_seccion}' "
-                    f"(pos {columna + 1}): '{seccion}' no es un número de NIE válido."
-                )
-        elif tipo == "9":  # CIF
-            if not cif.is_valid(seccion):
-                raise ValidacionError(
-                    f"Error en archivo '{archivo}', fila {fila}, sección '{nombre_seccion}' "
-                    f"(pos {columna + 1}): '{seccion}' no es un número de CIF válido."
+                    archivo,
+                    fila,
+                    nombre_seccion,
+                    columna,
+                    seccion,
+                    f"no es un número de {documento} válido.",
                 )
         return seccion
 
@@ -145,17 +210,22 @@ class Validaciones:
         Returns:
             str: La sección validada, concatenada con la etiqueta del diccionario.
         """
-        if nullable and (seccion is None or seccion.strip() == ""):
+        en_blanco = not seccion or seccion.isspace()
+        if not en_blanco and seccion in diccionario:
+            return f"{seccion}('{diccionario[seccion]}')"
+
+        if nullable and en_blanco:
             return seccion
 
-        if seccion.strip() == "" or seccion not in diccionario:
-            raise ValidacionError(
-                f"Error en archivo '{archivo}', fila {fila}, sección '{nombre_seccion}' "
-                f"(pos {columna + 1}): '{seccion}' no coincide con ninguno de los siguientes "
-                f"valores: {list(diccionario.keys())}"
-            )
-        etiqueta = diccionario[seccion]
-        return seccion + f"('{etiqueta}')"
+        # En blanco o no está en el diccionario
+        raise ValidacionError(
+            archivo,
+            fila,
+            nombre_seccion,
+            columna,
+            seccion,
+            f"no coincide con ninguno de los siguientes valores: {list(diccionario)}",
+        )
 
     @staticmethod
     def validar_obligatorio(archivo, seccion, nombre_seccion, fila, columna):
@@ -175,10 +245,9 @@ class Validaciones:
         Returns:
             str: La sección validada.
         """
-        if seccion.strip() == "":
+        if not seccion or seccion.isspace():
             raise ValidacionError(
-                f"Error en archivo '{archivo}', fila {fila}, sección '{nombre_seccion}' "
-                f"(pos {columna + 1}): '{seccion}' no puede estar vacío."
+                archivo, fila, nombre_seccion, columna, seccion, "no puede estar vacío."
             )
         return seccion
 
@@ -203,14 +272,17 @@ class Validaciones:
         """
         if seccion not in valores:
             raise ValidacionError(
-                f"Error en archivo '{archivo}', fila {fila}, sección '{nombre_seccion}' "
-                f"(pos {columna + 1}): '{seccion}' no coincide con ninguno de los siguientes "
-                f"valores: '{valores}'."
+                archivo,
+                fila,
+                nombre_seccion,
+                columna,
+                seccion,
+                f"no coincide con ninguno de los siguientes valores: '{valores}'.",
             )
         return seccion
 
     @staticmethod
-    def validar_longitudes(nombre_archivo, lineas, longitud=70):
+    def validar_longitudes(nombre_archivo, lineas, longitud=70, longitudes=None):
         """
         Valida que todas las líneas del archivo tengan la longitud especificada.
 
@@ -218,12 +290,21 @@ class Validaciones:
             nombre_archivo (str): Nombre del archivo que se está procesando.
             lineas (list): Lista de líneas de texto.
             longitud (int, optional): Longitud esperada de cada línea. Por defecto es 70.
+            longitudes (Iterable[int], optional): Longitud de cada línea, si se puede
+                conocer sin recorrer las líneas. Por defecto se calcula de `lineas`, que
+                solo se recorren si alguna línea no tiene la longitud esperada.
 
         Raises:
             LongitudLineaError: Si alguna línea no cumple con la longitud requerida.
         """
-        for idx, linea in enumerate(lineas, start=1):
-            if len(linea) != longitud:
+        if longitudes is None:
+            longitudes = map(len, lineas)
+        # Un solo recorrido en C para el caso habitual en que todas son correctas; solo
+        # si hay alguna distinta se buscan las líneas una a una para informar de la primera
+        if set(longitudes) <= {longitud}:
+            return
+        for idx, longitud_linea in enumerate(map(len, lineas), start=1):
+            if longitud_linea != longitud:
                 raise LongitudLineaError(
-                    f"{nombre_archivo}, línea {idx}: longitud {len(linea)} != {longitud}"
+                    f"{nombre_archivo}, línea {idx}: longitud {longitud_linea} != {longitud}"
                 )